@@ -1,51 +1,227 @@
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, session as flask_session
+import time
+
+# Cold start timing begins before the heavier imports below
+startup_started = time.perf_counter()
+
+from flask import Flask, Blueprint, Response, current_app, render_template, send_from_directory, request, jsonify, flash, redirect, url_for, g, has_request_context, session as flask_session
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from collections import Counter, defaultdict, namedtuple
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import os
+import io
+import csv
+import json
+import queue
+import base64
+import hashlib
+import mimetypes
 import secrets
-import string
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
+import threading
+import click
 from dotenv import load_dotenv
-from sqlalchemy import text
-
-# Load environment variables FIRST
-load_dotenv()
-
-# Create Flask app with explicit template and static paths
-app = Flask(__name__, 
-            template_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates'),
-            static_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static'))
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'arndale-academy-secret-key-2024')
-
-# Neon PostgreSQL Configuration - FIXED for Vercel
-database_url = os.environ.get('DATABASE_URL' or 'sqlite:///voting_system.db')
-if database_url and database_url.startswith('postgres://'):
-    database_url = database_url.replace('postgres://', 'postgresql://', 1)
-app.config['SQLALCHEMY_DATABASE_URI'] = database_url or 'sqlite:///voting_system.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_recycle': 300,
-    'pool_pre_ping': True
-}
-
-# Remove file upload configurations for Vercel (serverless doesn't support file writes)
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
-
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'kjhgvmjgkgjhkjhrkjhrhrhkhtrhj9875609857&*##&*%#)%#KHVNDHG')
-app.config['SESSION_TYPE'] = 'filesystem'
-app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour session timeout
+from werkzeug.security import safe_join
+from sqlalchemy import text, func, case, literal, union_all, event, tuple_
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+# Load environment variables FIRST (Vercel injects them directly, so skip the .env lookup there)
+if not os.environ.get('VERCEL'):
+    load_dotenv()
+
+imports_finished = time.perf_counter()
+
+# Database connection pooling
+# Checkout wait buckets in seconds, used to size the pool from real traffic
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+class PoolMetrics:
+    """Process-wide counters for connection checkouts"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.checkouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+            self.wait_buckets = [0] * len(POOL_WAIT_BUCKETS)
+            self.overflow_checkouts = 0
+            self.overflow_max = 0
+            self.timeouts = 0
+
+    def record_checkout(self, wait, overflow):
+        with self.lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            for i, bound in enumerate(POOL_WAIT_BUCKETS):
+                if wait <= bound:
+                    self.wait_buckets[i] += 1
+            if overflow > 0:
+                self.overflow_checkouts += 1
+                self.overflow_max = max(self.overflow_max, overflow)
+
+    def record_timeout(self):
+        with self.lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'checkouts': self.checkouts,
+                'wait_seconds_total': round(self.wait_seconds_total, 6),
+                'wait_seconds_max': round(self.wait_seconds_max, 6),
+                'wait_seconds_buckets': dict(zip(POOL_WAIT_BUCKETS, self.wait_buckets)),
+                'overflow_checkouts': self.overflow_checkouts,
+                'overflow_max': self.overflow_max,
+                'timeouts': self.timeouts
+            }
 
-# Cloudinary Configuration
-cloudinary.config(
-    cloud_name=os.environ.get('CLOUDINARY_CLOUD_NAME'),
-    api_key=os.environ.get('CLOUDINARY_API_KEY'),
-    api_secret=os.environ.get('CLOUDINARY_API_SECRET'),
-    secure=True
-)
+pool_metrics = PoolMetrics()
 
-db = SQLAlchemy(app)
+class MeteredPoolMixin:
+    """Times every checkout, including any wait for a free connection and connect time"""
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        overflow = self.overflow() if isinstance(self, QueuePool) else 0
+        pool_metrics.record_checkout(time.perf_counter() - started, overflow)
+        return connection
+
+class MeteredQueuePool(MeteredPoolMixin, QueuePool):
+    pass
+
+class MeteredNullPool(MeteredPoolMixin, NullPool):
+    pass
+
+def env_flag(name, default=''):
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes')
+
+def database_pool_options(profile, database_uri):
+    """Engine options for a pooling profile.
+
+    serverless:   one connection per checkout, no pool; pair with PgBouncer or the Neon pooler
+    pooled:       a sized QueuePool for long-lived workers such as gunicorn
+    sqlite-local: SQLite's own defaults for development
+    """
+    if profile == 'serverless':
+        return {'poolclass': MeteredNullPool}
+    if profile == 'pooled':
+        return {
+            'poolclass': MeteredQueuePool,
+            'pool_size': int(os.environ.get('DATABASE_POOL_SIZE', 5)),
+            'max_overflow': int(os.environ.get('DATABASE_MAX_OVERFLOW', 10)),
+            'pool_timeout': float(os.environ.get('DATABASE_POOL_TIMEOUT', 30)),
+            # Recycle before the server drops idle connections instead of pinging on every checkout
+            'pool_recycle': int(os.environ.get('DATABASE_POOL_RECYCLE', 300)),
+            'pool_pre_ping': env_flag('DATABASE_POOL_PRE_PING')
+        }
+    if profile == 'sqlite-local':
+        # In-memory databases need the single shared connection Flask-SQLAlchemy sets up
+        return {} if ':memory:' in database_uri or database_uri == 'sqlite://' else {'poolclass': MeteredQueuePool}
+    raise ValueError(f'Unknown DATABASE_POOL_PROFILE: {profile}')
+
+def default_pool_profile(database_uri):
+    if database_uri.startswith('sqlite'):
+        return 'sqlite-local'
+    return 'serverless' if os.environ.get('VERCEL') else 'pooled'
+
+def configure_app(app):
+    """Read settings from the environment"""
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'arndale-academy-secret-key-2024')
+
+    # Neon PostgreSQL Configuration - FIXED for Vercel
+    database_url = os.environ.get('DATABASE_URL' or 'sqlite:///voting_system.db')
+    if database_url and database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url or 'sqlite:///voting_system.db'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Connection pooling profile: serverless, pooled or sqlite-local (see database_pool_options)
+    app.config['DATABASE_POOL_PROFILE'] = os.environ.get('DATABASE_POOL_PROFILE') or default_pool_profile(
+        app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database_pool_options(
+        app.config['DATABASE_POOL_PROFILE'], app.config['SQLALCHEMY_DATABASE_URI'])
+
+    # Live results stream: publish at most this many events per second per session
+    app.config['RESULTS_STREAM_MAX_EVENTS_PER_SECOND'] = float(os.environ.get('RESULTS_STREAM_MAX_EVENTS_PER_SECOND', 2))
+    app.config['RESULTS_STREAM_HEARTBEAT_SECONDS'] = 15
+
+    # Each open stream holds a worker thread for its whole life, so the stream needs threaded or
+    # async workers (gunicorn -k gthread --threads 32, or -k gevent); with sync workers a few
+    # dashboards would starve the kiosks. Streams are capped per process and closed after
+    # RESULTS_STREAM_MAX_SECONDS, and EventSource reconnects by itself. Vercel cuts functions off
+    # at their time limit, so streams are off there (0); dashboards poll /api/results/<id> instead.
+    app.config['RESULTS_STREAM_MAX_CONNECTIONS'] = int(os.environ.get(
+        'RESULTS_STREAM_MAX_CONNECTIONS', 0 if os.environ.get('VERCEL') else 16))
+    app.config['RESULTS_STREAM_MAX_SECONDS'] = int(os.environ.get('RESULTS_STREAM_MAX_SECONDS', 300))
+
+    # The cached active session is re-read at least this often to pick up changes made by other workers
+    app.config['ACTIVE_SESSION_CACHE_TTL_SECONDS'] = int(os.environ.get('ACTIVE_SESSION_CACHE_TTL_SECONDS', 5))
+
+    # Voter codes are generated into the pool this many at a time
+    app.config['VOTER_CODE_POOL_BLOCK'] = int(os.environ.get('VOTER_CODE_POOL_BLOCK', 1000))
+
+    # Roster imports are validated, allocated and inserted this many rows at a time
+    app.config['VOTER_IMPORT_CHUNK_SIZE'] = int(os.environ.get('VOTER_IMPORT_CHUNK_SIZE', 500))
+
+    # Compiled ballots are rebuilt at least this often to pick up edits made by other workers
+    app.config['BALLOT_CACHE_TTL_SECONDS'] = int(os.environ.get('BALLOT_CACHE_TTL_SECONDS', 30))
+
+    # Routes declaring @sql_statement_limit fail loudly when they exceed it; always on under app.testing
+    app.config['ENFORCE_SQL_STATEMENT_LIMITS'] = env_flag('ENFORCE_SQL_STATEMENT_LIMITS')
+
+    # Voting stats are memoized per tally version and recomputed at least this often for roster changes
+    app.config['VOTING_STATS_CACHE_TTL_SECONDS'] = int(os.environ.get('VOTING_STATS_CACHE_TTL_SECONDS', 5))
+
+    # /metrics is open unless a token is set, in which case scrapers send it as a Bearer token
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN', '')
+
+    # Remove file upload configurations for Vercel (serverless doesn't support file writes)
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'kjhgvmjgkgjhkjhrkjhrhrhkhtrhj9875609857&*##&*%#)%#KHVNDHG')
+    app.config['SESSION_TYPE'] = 'filesystem'
+    app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour session timeout
+
+    # Photos go to Cloudinary when it is configured, otherwise to static/uploads on local disk
+    app.config['PHOTO_STORAGE_BACKEND'] = os.environ.get('PHOTO_STORAGE_BACKEND') or (
+        'cloudinary' if os.environ.get('CLOUDINARY_CLOUD_NAME') else 'local')
+
+    # Self-hosted media offload: USE_X_SENDFILE for Apache/lighttpd, or an nginx internal
+    # location prefix that /media responses are redirected to with X-Accel-Redirect
+    app.config['USE_X_SENDFILE'] = env_flag('USE_X_SENDFILE')
+    app.config['MEDIA_X_ACCEL_REDIRECT_PREFIX'] = os.environ.get('MEDIA_X_ACCEL_REDIRECT_PREFIX', '')
+
+    # Photo uploads run on this many background threads so registration never waits on storage
+    app.config['PHOTO_UPLOAD_WORKERS'] = int(os.environ.get('PHOTO_UPLOAD_WORKERS', 4))
+
+    # Serverless hosts (Vercel) may freeze the instance as soon as the response is sent, so the
+    # background thread might never run. Jobs still pending after PHOTO_UPLOAD_STALE_SECONDS are
+    # finished by the dashboard's photo status polling, or by /api/admin/process-photo-uploads,
+    # which Vercel Cron calls with CRON_SECRET (see vercel.json; tighten the schedule on paid plans).
+    app.config['PHOTO_UPLOAD_STALE_SECONDS'] = int(os.environ.get('PHOTO_UPLOAD_STALE_SECONDS', 30))
+    app.config['PHOTO_UPLOAD_DRAIN_BATCH'] = int(os.environ.get('PHOTO_UPLOAD_DRAIN_BATCH', 10))
+    app.config['CRON_SECRET'] = os.environ.get('CRON_SECRET', '')
+
+    # Migrations are a deploy step (`flask db-upgrade`). Startup only reads the schema version,
+    # unless MIGRATE_ON_STARTUP is set for hosts without a deploy hook. Vercel has none, so it
+    # defaults to on there; set MIGRATE_ON_STARTUP=false if you run db-upgrade yourself.
+    app.config['SCHEMA_CHECK_ON_STARTUP'] = env_flag('SCHEMA_CHECK_ON_STARTUP', 'true')
+    app.config['MIGRATE_ON_STARTUP'] = env_flag('MIGRATE_ON_STARTUP', 'true' if os.environ.get('VERCEL') else '')
+
+db = SQLAlchemy()
+
+# All routes and commands live on this blueprint; create_app() registers it
+voting = Blueprint('voting', __name__, cli_group=None)
 
 # Hardcoded admin credentials
 ADMIN_CREDENTIALS = {
@@ -65,6 +241,12 @@ class Session(db.Model):
     
     positions = db.relationship('Position', backref='session', lazy=True, cascade='all, delete-orphan')
 
+    # Only one session is active, so the index holds a single row (a plain index on MySQL)
+    __table_args__ = (
+        db.Index('ix_sessions_active', 'is_active',
+                 postgresql_where=db.text('is_active'), sqlite_where=db.text('is_active = 1')),
+    )
+
 # In the Position model, add this field
 class Position(db.Model):
     __tablename__ = 'positions'
@@ -78,15 +260,25 @@ class Position(db.Model):
     
     candidates = db.relationship('Candidate', backref='position', lazy=True, cascade='all, delete-orphan')
 
+    # Ballots and listings read a session's positions in display order; grade ballots filter on grade
+    __table_args__ = (
+        db.Index('ix_positions_session_display_order', 'session_id', 'display_order'),
+        db.Index('ix_positions_grade_filter', 'grade_filter'),
+    )
+
 class Candidate(db.Model):
     __tablename__ = 'candidates'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(255), nullable=False)
     position_id = db.Column(db.Integer, db.ForeignKey('positions.id', ondelete='CASCADE'), nullable=False)
     photo_url = db.Column(db.String(500))
+    photo_renditions = db.Column(db.JSON)  # {rendition: {format: url}}
     grade = db.Column(db.String(50))
     manifesto = db.Column(db.Text)
-    votes = db.Column(db.Integer, default=0)
+
+    __table_args__ = (
+        db.Index('ix_candidates_position_id', 'position_id'),
+    )
 
 class Voter(db.Model):
     __tablename__ = 'voters'
@@ -95,40 +287,110 @@ class Voter(db.Model):
     name = db.Column(db.String(255), nullable=False)
     grade = db.Column(db.String(50), nullable=False)
     photo_url = db.Column(db.String(500))
+    photo_renditions = db.Column(db.JSON)  # {rendition: {format: url}}
     voter_code = db.Column(db.String(10), unique=True, nullable=False)
     registered_date = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     has_voted = db.Column(db.Boolean, default=False)
+
+    # Supports the roster's default newest-first keyset pagination, and grade
+    # listings and turnout counts without touching the table
+    __table_args__ = (
+        db.Index('ix_voters_registered_date_id', 'registered_date', 'id'),
+        db.Index('ix_voters_grade_has_voted', 'grade', 'has_voted'),
+    )
     
     @staticmethod
     def generate_voter_code():
         """Generate a unique 6-digit voter code"""
-        while True:
-            code = ''.join(secrets.choice(string.digits) for _ in range(6))
-            if not Voter.query.filter_by(voter_code=code).first():
-                return code
+        return Voter.generate_voter_codes(1)[0]
+
+    @staticmethod
+    def generate_voter_codes(count):
+        """Hand out `count` unique 6-digit voter codes from the pre-shuffled code pool.
+
+        Codes leave the pool in the caller's transaction, so a rollback returns them.
+        """
+        codes = []
+        for _ in range(3):
+            rows = db.session.query(VoterCodePool.id, VoterCodePool.code).order_by(VoterCodePool.id).limit(
+                count - len(codes)
+            ).with_for_update(skip_locked=True).all()
+            for ids in chunked([row.id for row in rows]):
+                VoterCodePool.query.filter(VoterCodePool.id.in_(ids)).delete(synchronize_session=False)
+            codes.extend(row.code for row in rows)
+
+            if len(codes) == count:
+                return codes
+            VoterCodePool.refill(count - len(codes), exclude=codes)
+
+        raise RuntimeError('Unable to allocate voter codes: the code pool could not be refilled')
 
     @staticmethod
     def generate_student_id():
         """Generate a unique student ID in format: AA-STU-YYYY-XXXX"""
+        return Voter.generate_student_ids(1)[0]
+
+    @staticmethod
+    def generate_student_ids(count):
+        """Reserve a contiguous block of `count` student IDs for the current year"""
         current_year = datetime.now().year
-        
-        # Get the highest student ID number for this year
-        last_voter = Voter.query.filter(
-            Voter.student_id.like(f"AA-STU-{current_year}-%")
-        ).order_by(Voter.student_id.desc()).first()
-        
-        if last_voter:
-            # Extract the number part and increment
-            last_id = last_voter.student_id
-            last_number = int(last_id.split('-')[-1])
-            new_number = last_number + 1
-        else:
-            # First student of the year
-            new_number = 1
+        first_number = StudentIdCounter.reserve(current_year, count)
         
         # Format: AA-STU-YYYY-XXXX (4-digit number)
-        student_id = f"AA-STU-{current_year}-{new_number:04d}"
-        return student_id
+        return [f"AA-STU-{current_year}-{number:04d}" for number in range(first_number, first_number + count)]
+
+class StudentIdCounter(db.Model):
+    """Last student ID number issued per year"""
+    __tablename__ = 'student_id_counters'
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    last_number = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def reserve(year, count):
+        """Atomically reserve `count` consecutive numbers for `year` and return the first one"""
+        if db.session.get(StudentIdCounter, year) is None:
+            # First use of the counter for this year: continue from IDs issued before it existed
+            last_id = db.session.query(func.max(Voter.student_id)).filter(
+                Voter.student_id.like(f"AA-STU-{year}-%")
+            ).scalar()
+            last_number = int(last_id.split('-')[-1]) if last_id else 0
+            insert_ignore(StudentIdCounter, [{'year': year, 'last_number': last_number}])
+
+        # The upsert takes the row lock, so the read below sees this transaction's reservation
+        upsert_increment(StudentIdCounter, [{'year': year, 'last_number': count}], ['year'], 'last_number')
+        last_number = db.session.query(StudentIdCounter.last_number).filter_by(year=year).scalar()
+        return last_number - count + 1
+
+class VoterCodePool(db.Model):
+    """Unused voter codes, stored in random order and handed out lowest ID first"""
+    __tablename__ = 'voter_code_pool'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    code = db.Column(db.String(10), unique=True, nullable=False)
+
+    @staticmethod
+    def refill(minimum, exclude=()):
+        """Add at least `minimum` (and at least one block of) fresh codes to the pool.
+
+        `exclude` holds codes already taken from the pool but not yet saved on a voter.
+        """
+        needed = max(minimum, current_app.config['VOTER_CODE_POOL_BLOCK'])
+        fresh = set()
+        for _ in range(10):
+            draw = {f'{secrets.randbelow(10 ** 6):06d}' for _ in range(2 * (needed - len(fresh)))}
+            draw.difference_update(fresh, exclude)
+            # One IN query per chunk against issued and pooled codes, not one SELECT per code
+            for codes in chunked(draw):
+                draw.difference_update(row[0] for row in db.session.query(Voter.voter_code).filter(
+                    Voter.voter_code.in_(codes)
+                ).union_all(db.session.query(VoterCodePool.code).filter(VoterCodePool.code.in_(codes))))
+            fresh.update(list(draw)[:needed - len(fresh)])
+            if len(fresh) >= needed:
+                break
+
+        codes = list(fresh)
+        secrets.SystemRandom().shuffle(codes)
+        for block in chunked(codes):
+            insert_ignore(VoterCodePool, [{'code': code} for code in block])
 
 class VotingLog(db.Model):
     __tablename__ = 'voting_log'
@@ -144,6 +406,12 @@ class VotingLog(db.Model):
     candidate = db.relationship('Candidate')
     voter = db.relationship('Voter')
 
+    # One vote per voter per position - enforced by the database, not by a prior SELECT
+    __table_args__ = (
+        db.Index('uq_voting_log_session_position_voter', 'session_id', 'position_id', 'voter_id', unique=True),
+        db.Index('ix_voting_log_voter_id', 'voter_id'),
+    )
+
 # Add this class after the VotingLog model
 class MultiVotingLog(db.Model):
     __tablename__ = 'multi_voting_log'
@@ -160,23 +428,238 @@ class MultiVotingLog(db.Model):
     candidate = db.relationship('Candidate')
     voter = db.relationship('Voter')
 
-# Initialize database - ONLY when needed
-def init_database():
-    """Initialize database tables - call this from routes, not on import"""
+    # One first and one second choice per voter per position
+    __table_args__ = (
+        db.Index('uq_multi_voting_log_session_position_voter_order',
+                 'session_id', 'position_id', 'voter_id', 'vote_order', unique=True),
+        db.Index('ix_multi_voting_log_voter_id', 'voter_id'),
+    )
+
+class Tally(db.Model):
+    """Vote counts aggregated from the voting_log/multi_voting_log ledger.
+
+    Updated in the same transaction as every vote, and rebuilt from the
+    ledger with `flask rebuild-tally`. Single-choice votes use vote_order 1.
+    """
+    __tablename__ = 'tally'
+    session_id = db.Column(db.Integer, db.ForeignKey('sessions.id', ondelete='CASCADE'), primary_key=True)
+    position_id = db.Column(db.Integer, db.ForeignKey('positions.id', ondelete='CASCADE'), primary_key=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id', ondelete='CASCADE'), primary_key=True)
+    vote_order = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    # The per-position candidate listing joins on (position, candidate) without the session
+    __table_args__ = (
+        db.Index('ix_tally_position_candidate', 'position_id', 'candidate_id'),
+    )
+
+class TallyVersion(db.Model):
+    """Per-session counter bumped in the same transaction as any change to the session's results"""
+    __tablename__ = 'tally_versions'
+    session_id = db.Column(db.Integer, db.ForeignKey('sessions.id', ondelete='CASCADE'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class PhotoUpload(db.Model):
+    """Background photo upload job; the owner's photo_url is filled in when it completes"""
+    __tablename__ = 'photo_uploads'
+    id = db.Column(db.Integer, primary_key=True)
+    owner_type = db.Column(db.String(20), nullable=False)  # 'candidate' or 'voter'
+    owner_id = db.Column(db.Integer, nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    data = db.Column(db.LargeBinary)  # Cleared once the upload completes
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, done, failed
+    error = db.Column(db.Text)
+    created_date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (db.Index('ix_photo_uploads_owner', 'owner_type', 'owner_id'),)
+
+class SchemaVersion(db.Model):
+    """One row per applied migration; the schema version is the highest one"""
+    __tablename__ = 'schema_version'
+    version = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    applied_date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+# Schema migrations - applied in order by `flask db-upgrade` at deploy time, never on
+# the request path. Databases created before the runner existed may already contain
+# any of these changes, so every step checks before it alters.
+def create_tables(*models):
+    connection = db.session.connection()
+    for model in models:
+        model.__table__.create(connection, checkfirst=True)
+
+def add_columns(model, *column_names):
+    connection = db.session.connection()
+    existing_columns = {column['name'] for column in db.inspect(connection).get_columns(model.__tablename__)}
+    for column_name in column_names:
+        if column_name not in existing_columns:
+            column_type = model.__table__.c[column_name].type.compile(dialect=connection.dialect)
+            connection.execute(text(f'ALTER TABLE {model.__tablename__} ADD COLUMN {column_name} {column_type}'))
+
+def create_indexes(*models):
+    connection = db.session.connection()
+    for model in models:
+        for index in model.__table__.indexes:
+            index.create(connection, checkfirst=True)
+
+def migrate_initial_schema():
+    create_tables(Session, Position, Candidate, Voter, VotingLog, MultiVotingLog)
+
+def migrate_position_voting_columns():
+    # Replaces the old update_database.py script
+    add_columns(Position, 'grade_filter', 'voting_type')
+    Position.query.filter(Position.voting_type.is_(None)).update({'voting_type': 'single'}, synchronize_session=False)
+
+def migrate_tally():
+    tally_existed = db.inspect(db.session.connection()).has_table(Tally.__tablename__)
+    create_tables(Tally, TallyVersion)
+    # Databases that predate the tally table already hold votes in the ledger
+    if not tally_existed:
+        rebuild_tally()
+
+def migrate_allocators():
+    create_tables(VoterCodePool, StudentIdCounter)
+
+def delete_duplicate_rows(model, *key_columns):
+    """Keep the lowest id for each key and delete the rest; returns how many rows went"""
+    keep = db.select(func.min(model.id).label('id')).group_by(
+        *(getattr(model, column) for column in key_columns)
+    ).subquery()
+    return db.session.execute(db.delete(model).where(model.id.not_in(db.select(keep.c.id)))).rowcount
+
+def migrate_hot_path_indexes():
+    # Databases that hit the double-vote race hold duplicate ledger rows, which would make
+    # the unique indexes fail to build. The earliest vote for each key wins.
+    duplicates = (delete_duplicate_rows(VotingLog, 'session_id', 'position_id', 'voter_id')
+                  + delete_duplicate_rows(MultiVotingLog, 'session_id', 'position_id', 'voter_id', 'vote_order'))
+    if duplicates:
+        print(f'Removed {duplicates} duplicate votes; rebuilding the tally')
+        rebuild_tally()
+    create_indexes(Voter, VotingLog, MultiVotingLog)
+
+def migrate_photo_uploads():
+    create_tables(PhotoUpload)
+    add_columns(Candidate, 'photo_renditions')
+    add_columns(Voter, 'photo_renditions')
+
+def migrate_hot_path_index_set():
+    create_indexes(Session, Position, Candidate, Voter, VotingLog, MultiVotingLog)
+
+def migrate_tally_position_index():
+    create_indexes(Tally)
+
+MIGRATIONS = [
+    (1, 'initial schema', migrate_initial_schema),
+    (2, 'position voting columns', migrate_position_voting_columns),
+    (3, 'vote tally', migrate_tally),
+    (4, 'voter code pool and student ID counters', migrate_allocators),
+    (5, 'hot path indexes', migrate_hot_path_indexes),
+    (6, 'photo uploads and renditions', migrate_photo_uploads),
+    (7, 'hot path index set', migrate_hot_path_index_set),
+    (8, 'tally position index', migrate_tally_position_index),
+]
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version():
+    """Read the applied schema version with a single query; 0 if the database was never migrated"""
     try:
-        # This will create tables if they don't exist
-        db.create_all()
-        print("SUCCESS: Database tables created/verified successfully")
-        return True
-    except Exception as e:
-        print(f"ERROR: Database initialization failed: {e}")
-        return False
+        with db.engine.connect() as connection:
+            return connection.execute(db.select(func.max(SchemaVersion.version))).scalar() or 0
+    except Exception:
+        return 0
+
+# Arbitrary advisory lock key shared by every process that migrates this database
+MIGRATION_LOCK_KEY = 7270_2021
+MIGRATION_ATTEMPTS = 3
+
+def lock_migrations():
+    """Serialize concurrent migrators, e.g. several cold starts, until the current transaction ends"""
+    if db.session.connection().dialect.name == 'postgresql':
+        db.session.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+
+def run_migration_step(step, is_applied=lambda: False):
+    """Run one step in its own transaction unless is_applied(); returns whether it ran.
+
+    A step that fails while another process is applying it is retried, since every
+    step checks before it alters, and skipped once the other process has finished.
+    """
+    for attempt in range(MIGRATION_ATTEMPTS):
+        lock_migrations()
+        try:
+            if is_applied():
+                db.session.rollback()
+                return False
+            step()
+            db.session.commit()
+            return True
+        except Exception:
+            db.session.rollback()
+            if attempt == MIGRATION_ATTEMPTS - 1:
+                raise
+            time.sleep(0.5 * (attempt + 1))
+
+def migrate_database():
+    """Apply pending migrations in order, each in its own transaction.
+
+    Safe to run from several processes at once, e.g. concurrent cold starts: on PostgreSQL
+    each step runs under an advisory lock, elsewhere run_migration_step retries.
+    """
+    if get_schema_version() >= LATEST_SCHEMA_VERSION:
+        return []
+    
+    run_migration_step(lambda: create_tables(SchemaVersion))
+    
+    applied = []
+    for version, name, migrate in MIGRATIONS:
+        def step():
+            migrate()
+            db.session.add(SchemaVersion(version=version, name=name))
+        
+        def is_applied():
+            return (db.session.query(func.max(SchemaVersion.version)).scalar() or 0) >= version
+        
+        if run_migration_step(step, is_applied):
+            applied.append((version, name))
+    return applied
+
+@voting.cli.command('db-upgrade')
+def db_upgrade_command():
+    """Apply pending schema migrations."""
+    applied = migrate_database()
+    for version, name in applied:
+        click.echo(f'Applied migration {version}: {name}')
+    click.echo(f'Database schema is at version {LATEST_SCHEMA_VERSION}')
+
+@voting.cli.command('db-version')
+def db_version_command():
+    """Show the applied and latest schema versions."""
+    click.echo(f'Applied: {get_schema_version()}, latest: {LATEST_SCHEMA_VERSION}')
 
 # Cloudinary Helper Functions
+# The SDK is imported and configured on first upload, keeping it out of cold starts
+cloudinary_lock = threading.Lock()
+cloudinary_configured = False
+
+def get_cloudinary_uploader():
+    global cloudinary_configured
+    import cloudinary
+    import cloudinary.uploader
+
+    with cloudinary_lock:
+        if not cloudinary_configured:
+            cloudinary.config(
+                cloud_name=os.environ.get('CLOUDINARY_CLOUD_NAME'),
+                api_key=os.environ.get('CLOUDINARY_API_KEY'),
+                api_secret=os.environ.get('CLOUDINARY_API_SECRET'),
+                secure=True
+            )
+            cloudinary_configured = True
+    return cloudinary.uploader
+
 def upload_to_cloudinary(file, folder):
     """Upload file to Cloudinary and return URL"""
     try:
-        result = cloudinary.uploader.upload(
+        result = get_cloudinary_uploader().upload(
             file,
             folder=f"arndale-voting/{folder}",
             resource_type="image"
@@ -193,13 +676,521 @@ def delete_from_cloudinary(url):
         if 'arndale-voting/' in url:
             public_id = url.split('/')[-1].split('.')[0]
             full_public_id = f"arndale-voting/{public_id}"
-            cloudinary.uploader.destroy(full_public_id)
+            get_cloudinary_uploader().destroy(full_public_id)
     except Exception as e:
         print(f"Cloudinary delete error: {e}")
 
+class CloudinaryPhotoStorage:
+    """Stores photos in Cloudinary"""
+    def save(self, data, filename, folder):
+        url = upload_to_cloudinary(io.BytesIO(data), folder)
+        if not url:
+            raise RuntimeError('Cloudinary upload failed')
+        return url
+
+    def delete(self, url):
+        delete_from_cloudinary(url)
+
+class LocalPhotoStorage:
+    """Content-addressed store under static/uploads, served from /media.
+
+    Files are named by the SHA-256 of their bytes, so re-uploads of the same
+    image share one file and every URL can be cached forever.
+    """
+    folders = {'candidates': 'candidate_photos', 'voters': 'voter_photos'}
+
+    def save(self, data, filename, folder):
+        extension = filename.rsplit('.', 1)[1].lower()
+        relative_path = f"{self.folders.get(folder, folder)}/{hashlib.sha256(data).hexdigest()}.{extension}"
+        path = os.path.join(get_media_root(), relative_path)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        return f"{MEDIA_URL_PATH}/{relative_path}"
+
+    def delete(self, url):
+        # Files may be shared by several records; `flask gc-media` removes unreferenced ones
+        pass
+
+photo_storage_backends = {
+    'cloudinary': CloudinaryPhotoStorage,
+    'local': LocalPhotoStorage
+}
+
+MEDIA_URL_PATH = '/media'
+CONTENT_ADDRESSED_NAME_LENGTH = 64
+
+def is_content_addressed(filename):
+    """True for store files named by the SHA-256 of their content, which never change in place"""
+    stem = os.path.basename(filename).split('.', 1)[0]
+    return len(stem) == CONTENT_ADDRESSED_NAME_LENGTH and all(char in '0123456789abcdef' for char in stem)
+
+def cache_forever(response):
+    """Far-future, immutable caching for responses whose URL changes whenever the content does"""
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
+
+def get_media_root():
+    return os.path.join(current_app.static_folder, 'uploads')
+
+def get_photo_storage():
+    return photo_storage_backends[current_app.config['PHOTO_STORAGE_BACKEND']]()
+
+def delete_photo(url):
+    try:
+        get_photo_storage().delete(url)
+    except Exception as e:
+        print(f"Photo delete error: {e}")
+
+# Every photo is normalized into these renditions (longest side in pixels), each
+# stored as WebP with a JPEG fallback. photo_url points at the display JPEG.
+PHOTO_RENDITION_SIZES = {'thumbnail': 160, 'display': 640}
+PHOTO_RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True})
+}
+
+def normalize_photo(data):
+    """Auto-orient, strip metadata and downsize a photo; return {rendition: {format: bytes}}"""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+        raise ValueError(f'Not a usable image: {e}')
+
+    # Flatten transparency onto white so the JPEG fallback looks the same as the WebP
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    else:
+        image = image.convert('RGB')
+
+    renditions = {}
+    for rendition, size in PHOTO_RENDITION_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        renditions[rendition] = {}
+        for extension, (image_format, options) in PHOTO_RENDITION_FORMATS.items():
+            # Pillow only writes EXIF when it is passed in, so the saved renditions carry none
+            output = io.BytesIO()
+            resized.save(output, image_format, **options)
+            renditions[rendition][extension] = output.getvalue()
+    return renditions
+
+def delete_photo_renditions(photo_url, renditions):
+    urls = {url for formats in (renditions or {}).values() for url in formats.values()}
+    if photo_url:
+        urls.add(photo_url)
+    for url in urls:
+        delete_photo(url)
+
+# Photo upload queue - records are saved with a pending upload job, and a worker
+# thread moves the image to storage and fills in photo_url afterwards
+PHOTO_FOLDERS = {'candidate': 'candidates', 'voter': 'voters'}
+photo_upload_executor = None
+photo_upload_executor_lock = threading.Lock()
+
+def get_photo_upload_executor():
+    global photo_upload_executor
+    with photo_upload_executor_lock:
+        if photo_upload_executor is None:
+            photo_upload_executor = ThreadPoolExecutor(max_workers=current_app.config['PHOTO_UPLOAD_WORKERS'],
+                                                       thread_name_prefix='photo-upload')
+        return photo_upload_executor
+
+def queue_photo_upload(owner_type, owner_id, photo):
+    """Add an upload job for the owner to the current transaction; submit it after commit"""
+    upload = PhotoUpload(owner_type=owner_type, owner_id=owner_id, filename=photo.filename, data=photo.read())
+    db.session.add(upload)
+    return upload
+
+def submit_photo_upload(upload_id):
+    get_photo_upload_executor().submit(run_photo_upload, current_app._get_current_object(), upload_id)
+
+def run_photo_upload(app, upload_id):
+    with app.app_context():
+        try:
+            process_photo_upload(upload_id)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Photo upload {upload_id} error: {e}")
+
+def process_photo_upload(upload_id):
+    upload = db.session.get(PhotoUpload, upload_id)
+    if not upload or upload.status != 'pending':
+        return
+
+    storage = get_photo_storage()
+    folder = PHOTO_FOLDERS[upload.owner_type]
+    urls = {}
+    try:
+        for rendition, formats in normalize_photo(upload.data).items():
+            urls[rendition] = {}
+            for extension, data in formats.items():
+                urls[rendition][extension] = storage.save(data, f'{rendition}.{extension}', folder)
+    except Exception as e:
+        delete_photo_renditions(None, urls)
+        upload.status = 'failed'
+        upload.error = str(e)
+        db.session.commit()
+        return
+
+    model = Candidate if upload.owner_type == 'candidate' else Voter
+    owner = db.session.get(model, upload.owner_id)
+    if owner:
+        owner.photo_url = urls['display']['jpeg']
+        owner.photo_renditions = urls
+        if upload.owner_type == 'candidate':
+            bump_tally_version([owner.position.session_id])
+            mark_ballot_changed()
+    else:
+        # Owner was deleted while the upload was running
+        delete_photo_renditions(None, urls)
+    upload.status = 'done'
+    upload.data = None
+    db.session.commit()
+
+def stale_photo_uploads():
+    """Pending uploads the background workers have not finished within PHOTO_UPLOAD_STALE_SECONDS"""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=current_app.config['PHOTO_UPLOAD_STALE_SECONDS'])
+    return PhotoUpload.query.filter(PhotoUpload.status == 'pending', PhotoUpload.created_date <= cutoff)
+
+def drain_photo_uploads(query, limit=None):
+    """Run the uploads matched by query in this process; returns how many were attempted"""
+    upload_ids = [row[0] for row in query.with_entities(PhotoUpload.id).order_by(PhotoUpload.id).limit(limit)]
+    for upload_id in upload_ids:
+        try:
+            process_photo_upload(upload_id)
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error('Photo upload %s error: %s', upload_id, e)
+    return len(upload_ids)
+
+def photo_status(owner_type, owner_id):
+    upload = PhotoUpload.query.filter_by(owner_type=owner_type, owner_id=owner_id).order_by(
+        PhotoUpload.id.desc()).first()
+    return upload.status if upload else None
+
+@voting.cli.command('process-photo-uploads')
+def process_photo_uploads_command():
+    """Run pending photo uploads, e.g. ones left behind by a restarted worker."""
+    processed = drain_photo_uploads(PhotoUpload.query.filter_by(status='pending'))
+    click.echo(f'Processed {processed} photo uploads')
+
+@voting.route('/api/admin/process-photo-uploads', methods=['GET', 'POST'])
+def process_photo_uploads():
+    """Finish uploads the background workers never ran. Vercel Cron calls this with CRON_SECRET"""
+    cron_secret = current_app.config['CRON_SECRET']
+    if 'admin_logged_in' not in flask_session and not (
+            cron_secret and request.headers.get('Authorization') == f'Bearer {cron_secret}'):
+        return jsonify({'error': 'Admin login required'}), 401
+    
+    processed = drain_photo_uploads(stale_photo_uploads(), limit=current_app.config['PHOTO_UPLOAD_DRAIN_BATCH'])
+    pending = PhotoUpload.query.filter_by(status='pending').count()
+    return jsonify({'processed': processed, 'pending': pending})
+
 # Helper functions
+# Hot-path queries. The routes run these builders and `flask check-query-plans` EXPLAINs
+# the same ones, so the checked plans cannot drift away from what the routes execute.
+def active_session_query():
+    return Session.query.filter_by(is_active=True)
+
+def voter_by_code_query(voter_code):
+    return Voter.query.filter_by(voter_code=voter_code)
+
+def session_positions_query(session_id):
+    """A session's positions with their candidate counts, for the admin listing"""
+    return db.session.query(
+        Position.id, Position.name, Position.display_order, Position.description,
+        func.count(Candidate.id)
+    ).outerjoin(Candidate, Candidate.position_id == Position.id).filter(
+        Position.session_id == session_id
+    ).group_by(Position.id).order_by(Position.display_order, Position.name)
+
+def position_candidates_query(position_id):
+    """A position's candidates with their vote totals"""
+    return db.session.query(
+        Candidate.id, Candidate.name, Candidate.grade, Candidate.photo_url, Candidate.photo_renditions,
+        Candidate.manifesto, func.coalesce(func.sum(Tally.count), 0)
+    ).outerjoin(Tally, (Tally.candidate_id == Candidate.id) & (Tally.position_id == Candidate.position_id)).filter(
+        Candidate.position_id == position_id
+    ).group_by(Candidate.id).order_by(Candidate.name)
+
+def ballot_positions_query(session_id, grade):
+    """Positions on one grade's ballot: those open to every grade plus the grade's own"""
+    return Position.query.filter(
+        Position.session_id == session_id,
+        (Position.grade_filter.is_(None)) | (Position.grade_filter == grade)
+    ).order_by(Position.display_order, Position.id)
+
+def ballot_candidates_query(position_ids):
+    return db.session.query(Candidate.id, Candidate.position_id).filter(Candidate.position_id.in_(position_ids))
+
+def candidate_votes_query(session_id):
+    """Votes per candidate in a session, summed over vote orders; filters on the tally key prefix"""
+    return db.session.query(
+        Tally.candidate_id, func.sum(Tally.count).label('votes')
+    ).filter(Tally.session_id == session_id).group_by(Tally.candidate_id)
+
+def session_tally_query(session_id):
+    """Votes per position and candidate in a session, for the live results stream"""
+    return db.session.query(Tally.position_id, Tally.candidate_id, func.sum(Tally.count)).filter(
+        Tally.session_id == session_id
+    ).group_by(Tally.position_id, Tally.candidate_id)
+
+def position_votes_query(session_id):
+    """Every position and candidate in a session with its summed votes, for the stats page"""
+    candidate_votes = candidate_votes_query(session_id).subquery()
+    return db.session.query(
+        Position.id, Position.name, Candidate.id, Candidate.name,
+        func.coalesce(candidate_votes.c.votes, 0)
+    ).outerjoin(Candidate, Candidate.position_id == Position.id).outerjoin(
+        candidate_votes, candidate_votes.c.candidate_id == Candidate.id
+    ).filter(Position.session_id == session_id).order_by(Position.id, Candidate.id)
+
+def results_positions_query(session_id):
+    return Position.query.filter_by(session_id=session_id).order_by(Position.display_order)
+
+def results_candidates_query(position_ids):
+    return Candidate.query.filter(Candidate.position_id.in_(position_ids)).order_by(Candidate.id)
+
+def voter_page_query(columns, limit, grade=None, has_voted=None, name=None, student_id=None, after=None):
+    """One keyset page of voters, newest first; after is the (registered_date, id) of the previous page's last row"""
+    query = db.session.query(*columns)
+    if grade:
+        query = query.filter(Voter.grade == grade)
+    if has_voted is True:
+        query = query.filter(Voter.has_voted.is_(True))
+    elif has_voted is False:
+        query = query.filter(Voter.has_voted.isnot(True))
+    if name:
+        query = query.filter(Voter.name.startswith(name, autoescape=True))
+    if student_id:
+        query = query.filter(Voter.student_id.startswith(student_id, autoescape=True))
+    if after is not None:
+        query = query.filter(tuple_(Voter.registered_date, Voter.id) < after)
+    return query.order_by(Voter.registered_date.desc(), Voter.id.desc()).limit(limit)
+
+def turnout_by_grade_query():
+    return db.session.query(
+        Voter.grade,
+        func.count(Voter.id),
+        func.count(case((Voter.has_voted.is_(True), 1)))
+    ).group_by(Voter.grade).order_by(Voter.grade)
+
+def grade_roster_query(grade):
+    return db.session.query(
+        Voter.id, Voter.name, Voter.grade, Voter.student_id, Voter.has_voted, Voter.voter_code
+    ).filter_by(grade=grade).order_by(Voter.name)
+
+def scope_ledger(query, log, session_id=None, position_id=None, voter_id=None):
+    """Restrict a voting_log or multi_voting_log query to a session, position and/or voter"""
+    if session_id is not None:
+        query = query.filter(log.session_id == session_id)
+    if position_id is not None:
+        query = query.filter(log.position_id == position_id)
+    if voter_id is not None:
+        query = query.filter(log.voter_id == voter_id)
+    return query
+
+# Read-only copy of the active session, safe to keep across requests
+ActiveSession = namedtuple('ActiveSession', ['id', 'name', 'academic_year'])
+
+active_session_cache = {'generation': 0, 'entry': None}
+active_session_cache_lock = threading.Lock()
+
 def get_active_session():
-    return Session.query.filter_by(is_active=True).first()
+    """Return the active session from a process-local cache, re-reading it after invalidation or the TTL"""
+    now = time.monotonic()
+    with active_session_cache_lock:
+        generation = active_session_cache['generation']
+        entry = active_session_cache['entry']
+    if entry and now - entry['loaded_at'] < current_app.config['ACTIVE_SESSION_CACHE_TTL_SECONDS']:
+        return entry['session']
+
+    session = active_session_query().first()
+    active_session = ActiveSession(session.id, session.name, session.academic_year) if session else None
+    with active_session_cache_lock:
+        # Do not store a value read before an invalidation that happened meanwhile
+        if active_session_cache['generation'] == generation:
+            active_session_cache['entry'] = {'session': active_session, 'loaded_at': now}
+    return active_session
+
+def invalidate_active_session():
+    with active_session_cache_lock:
+        active_session_cache['generation'] += 1
+        active_session_cache['entry'] = None
+
+def mark_active_session_changed():
+    """Drop the cached active session once the current transaction commits"""
+    db.session.info['active_session_changed'] = True
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_changed_caches(session):
+    invalidate_results_cache(session.info.pop('changed_results', set()))
+    if session.info.pop('ballot_changed', False):
+        invalidate_ballot_cache()
+    if session.info.pop('active_session_changed', False):
+        invalidate_active_session()
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_changed_caches(session):
+    session.info.pop('changed_results', None)
+    session.info.pop('ballot_changed', None)
+    session.info.pop('active_session_changed', None)
+
+def dialect_insert(model):
+    """Return an INSERT for the bound database's dialect (supports ON CONFLICT clauses) and the dialect name"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model), dialect
+
+def insert_ignore(model, rows):
+    """Insert rows, silently skipping any that collide with an existing key"""
+    stmt, dialect = dialect_insert(model)
+    if dialect == 'mysql':
+        stmt = stmt.prefix_with('IGNORE')
+    else:
+        stmt = stmt.on_conflict_do_nothing()
+    db.session.execute(stmt, rows)
+
+def upsert_increment(model, rows, key_columns, column):
+    """Insert rows, or add their `column` value to the existing rows with the same key, in one statement"""
+    stmt, dialect = dialect_insert(model)
+    stmt = stmt.values(rows)
+    if dialect == 'mysql':
+        stmt = stmt.on_duplicate_key_update({column: getattr(model, column) + stmt.inserted[column]})
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={column: getattr(model, column) + stmt.excluded[column]}
+        )
+    db.session.execute(stmt)
+
+def bump_tally(deltas):
+    """Apply vote count changes to the tally in a single upsert.
+
+    deltas maps (session_id, position_id, candidate_id, vote_order) to the
+    number of votes to add (negative to retract).
+    """
+    rows = [
+        {'session_id': key[0], 'position_id': key[1], 'candidate_id': key[2], 'vote_order': key[3], 'count': delta}
+        for key, delta in sorted(deltas.items()) if delta
+    ]
+    if not rows:
+        return
+
+    upsert_increment(Tally, rows, ['session_id', 'position_id', 'candidate_id', 'vote_order'], 'count')
+    bump_tally_version({row['session_id'] for row in rows})
+
+def bump_tally_version(session_ids):
+    """Mark the results of these sessions as changed once the current transaction commits"""
+    session_ids = sorted({session_id for session_id in session_ids if session_id is not None})
+    if not session_ids:
+        return
+
+    upsert_increment(TallyVersion, [{'session_id': session_id, 'version': 1} for session_id in session_ids],
+                     ['session_id'], 'version')
+    db.session.info.setdefault('changed_results', set()).update(session_ids)
+
+def get_tally_version(session_id):
+    return db.session.query(TallyVersion.version).filter_by(session_id=session_id).scalar() or 0
+
+def rebuild_tally(session_id=None):
+    """Recompute the tally from the ledger with one grouped INSERT ... SELECT"""
+    single_votes = db.session.query(
+        VotingLog.session_id, VotingLog.position_id, VotingLog.candidate_id,
+        literal(1).label('vote_order'), func.count().label('count')
+    )
+    multi_votes = db.session.query(
+        MultiVotingLog.session_id, MultiVotingLog.position_id, MultiVotingLog.candidate_id,
+        MultiVotingLog.vote_order, func.count().label('count')
+    )
+    tally_rows = Tally.query
+    if session_id is not None:
+        single_votes = single_votes.filter(VotingLog.session_id == session_id)
+        multi_votes = multi_votes.filter(MultiVotingLog.session_id == session_id)
+        tally_rows = tally_rows.filter(Tally.session_id == session_id)
+
+    single_votes = single_votes.group_by(VotingLog.session_id, VotingLog.position_id, VotingLog.candidate_id)
+    multi_votes = multi_votes.group_by(MultiVotingLog.session_id, MultiVotingLog.position_id,
+                                       MultiVotingLog.candidate_id, MultiVotingLog.vote_order)
+
+    tally_rows.delete(synchronize_session=False)
+    db.session.execute(db.insert(Tally).from_select(
+        ['session_id', 'position_id', 'candidate_id', 'vote_order', 'count'],
+        union_all(single_votes.statement, multi_votes.statement)
+    ))
+    bump_tally_version([session_id] if session_id is not None else [row[0] for row in db.session.query(Session.id)])
+
+def retract_votes(session_id=None, position_id=None, voter_id=None):
+    """Take the ledger rows in scope out of the tally, then delete them.
+
+    The tally is decremented with one grouped UPDATE ... FROM over the ledger
+    before the rows are deleted, all inside the caller's transaction.
+    """
+    def scoped(query, log):
+        return scope_ledger(query, log, session_id, position_id, voter_id)
+
+    single_votes = scoped(db.session.query(
+        VotingLog.session_id, VotingLog.position_id, VotingLog.candidate_id,
+        literal(1).label('vote_order'), func.count().label('count')
+    ), VotingLog).group_by(VotingLog.session_id, VotingLog.position_id, VotingLog.candidate_id)
+    multi_votes = scoped(db.session.query(
+        MultiVotingLog.session_id, MultiVotingLog.position_id, MultiVotingLog.candidate_id,
+        MultiVotingLog.vote_order, func.count().label('count')
+    ), MultiVotingLog).group_by(MultiVotingLog.session_id, MultiVotingLog.position_id,
+                                MultiVotingLog.candidate_id, MultiVotingLog.vote_order)
+    retracted = union_all(single_votes.statement, multi_votes.statement).subquery()
+
+    session_ids = [row[0] for row in db.session.query(retracted.c.session_id).distinct()]
+    if not session_ids:
+        return
+
+    db.session.execute(db.update(Tally).values(count=Tally.count - retracted.c.count).where(
+        Tally.session_id == retracted.c.session_id,
+        Tally.position_id == retracted.c.position_id,
+        Tally.candidate_id == retracted.c.candidate_id,
+        Tally.vote_order == retracted.c.vote_order
+    ))
+    bump_tally_version(session_ids)
+
+    scoped(VotingLog.query, VotingLog).delete(synchronize_session=False)
+    scoped(MultiVotingLog.query, MultiVotingLog).delete(synchronize_session=False)
+
+def get_candidate_votes(session_id):
+    """Return {candidate_id: votes} for a session from the tally, summed over vote orders"""
+    return {candidate_id: int(votes or 0) for candidate_id, votes in candidate_votes_query(session_id)}
+
+@voting.cli.command('rebuild-tally')
+@click.option('--session-id', type=int, default=None, help='Only rebuild this session')
+def rebuild_tally_command(session_id):
+    """Recompute vote tallies from the voting ledger."""
+    rebuild_tally(session_id)
+    db.session.commit()
+    click.echo('Tally rebuilt for ' + (f'session {session_id}' if session_id else 'all sessions'))
+
+def chunked(items, size=500):
+    """Yield successive lists of at most `size` items, to keep IN lists and batches bounded"""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
@@ -217,39 +1208,252 @@ def get_voter_stats():
         'participation_rate': round(participation_rate, 1)
     }
 
+# SQL statement budget per route, so listings cannot quietly turn into N+1 loops
+@event.listens_for(Engine, 'before_cursor_execute')
+def count_sql_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.sql_statement_count = g.get('sql_statement_count', 0) + 1
+        if context is not None:
+            context.statement_started = time.perf_counter()
+
+@voting.before_app_request
+def reset_sql_statement_count():
+    # g outlives the request when an app context was already pushed (CLI commands, scripts)
+    g.sql_statement_count = 0
+    g.sql_statement_seconds = 0.0
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def time_sql_statement(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, 'statement_started', None)
+    if started is not None and has_request_context():
+        g.sql_statement_seconds = g.get('sql_statement_seconds', 0.0) + time.perf_counter() - started
+
+def sql_statement_limit(limit, sample_args=()):
+    """Declare the most SQL statements a route may run per request.
+
+    sample_args names the query parameters `flask check-sql-budgets` should fill in.
+    """
+    def decorator(view):
+        view.sql_statement_limit = limit
+        view.sql_statement_sample_args = sample_args
+        return view
+    return decorator
+
+@voting.after_app_request
+def check_sql_statement_limit(response):
+    if not (current_app.testing or current_app.config['ENFORCE_SQL_STATEMENT_LIMITS']):
+        return response
+
+    view = current_app.view_functions.get(request.endpoint)
+    limit = getattr(view, 'sql_statement_limit', None)
+    count = g.get('sql_statement_count', 0)
+    if limit is not None and count > limit:
+        raise AssertionError(f'{request.endpoint} ran {count} SQL statements, limit is {limit}')
+    return response
+
+# Per-endpoint request metrics, exposed in Prometheus text format at /metrics.
+# Counters are per process; with several workers, each is scraped separately.
+REQUEST_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class RequestMetrics:
+    """Process-wide latency histograms, status codes and SQL work per Flask endpoint"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.latency = {}  # (endpoint, method) -> [bucket counts, sum, count]
+            self.responses = defaultdict(int)  # (endpoint, method, status) -> count
+            self.sql_statements = defaultdict(int)  # endpoint -> statements
+            self.sql_seconds = defaultdict(float)  # endpoint -> seconds
+
+    def record(self, endpoint, method, status, seconds, sql_statements, sql_seconds):
+        with self.lock:
+            histogram = self.latency.setdefault((endpoint, method), [[0] * len(REQUEST_LATENCY_BUCKETS), 0.0, 0])
+            for i, bound in enumerate(REQUEST_LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+            self.responses[(endpoint, method, status)] += 1
+            self.sql_statements[endpoint] += sql_statements
+            self.sql_seconds[endpoint] += sql_seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'latency': {key: (list(buckets), total, count) for key, (buckets, total, count) in self.latency.items()},
+                'responses': dict(self.responses),
+                'sql_statements': dict(self.sql_statements),
+                'sql_seconds': dict(self.sql_seconds)
+            }
+
+request_metrics = RequestMetrics()
+
+@voting.before_app_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@voting.after_app_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        request_metrics.record(
+            request.endpoint or 'unmatched', request.method, response.status_code,
+            time.perf_counter() - started,
+            g.get('sql_statement_count', 0), g.get('sql_statement_seconds', 0.0)
+        )
+    return response
+
+def prometheus_labels(**labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+def prometheus_histogram(lines, name, labels, bounds, cumulative_counts, total, count):
+    for bound, bucket_count in zip(bounds, cumulative_counts):
+        lines.append(f'{name}_bucket{prometheus_labels(**labels, le=bound)} {bucket_count}')
+    lines.append(f'{name}_bucket{prometheus_labels(**labels, le="+Inf")} {count}')
+    lines.append(f'{name}_sum{prometheus_labels(**labels)} {total}')
+    lines.append(f'{name}_count{prometheus_labels(**labels)} {count}')
+
+def render_prometheus_metrics():
+    """Request, SQL and connection pool metrics in the Prometheus text exposition format"""
+    requests = request_metrics.snapshot()
+    checkouts = pool_metrics.snapshot()
+    pool = get_pool_status()
+    lines = []
+
+    lines += ['# HELP arndale_http_request_duration_seconds Request latency by Flask endpoint.',
+              '# TYPE arndale_http_request_duration_seconds histogram']
+    for (endpoint, method), (buckets, total, count) in sorted(requests['latency'].items()):
+        prometheus_histogram(lines, 'arndale_http_request_duration_seconds', {'endpoint': endpoint, 'method': method},
+                             REQUEST_LATENCY_BUCKETS, buckets, total, count)
+
+    lines += ['# HELP arndale_http_responses_total Responses by Flask endpoint and status code.',
+              '# TYPE arndale_http_responses_total counter']
+    for (endpoint, method, status), count in sorted(requests['responses'].items()):
+        lines.append(f'arndale_http_responses_total{prometheus_labels(endpoint=endpoint, method=method, status=status)} {count}')
+
+    lines += ['# HELP arndale_sql_statements_total SQL statements run while serving each endpoint.',
+              '# TYPE arndale_sql_statements_total counter']
+    for endpoint, count in sorted(requests['sql_statements'].items()):
+        lines.append(f'arndale_sql_statements_total{prometheus_labels(endpoint=endpoint)} {count}')
+
+    lines += ['# HELP arndale_sql_duration_seconds_total Time spent executing SQL while serving each endpoint.',
+              '# TYPE arndale_sql_duration_seconds_total counter']
+    for endpoint, seconds in sorted(requests['sql_seconds'].items()):
+        lines.append(f'arndale_sql_duration_seconds_total{prometheus_labels(endpoint=endpoint)} {seconds}')
+
+    lines += ['# HELP arndale_db_pool_checkout_wait_seconds Time to check a connection out of the pool.',
+              '# TYPE arndale_db_pool_checkout_wait_seconds histogram']
+    prometheus_histogram(lines, 'arndale_db_pool_checkout_wait_seconds', {}, POOL_WAIT_BUCKETS,
+                         checkouts['wait_seconds_buckets'].values(), checkouts['wait_seconds_total'],
+                         checkouts['checkouts'])
+    lines += ['# HELP arndale_db_pool_overflow_checkouts_total Checkouts that needed an overflow connection.',
+              '# TYPE arndale_db_pool_overflow_checkouts_total counter',
+              f"arndale_db_pool_overflow_checkouts_total {checkouts['overflow_checkouts']}",
+              '# HELP arndale_db_pool_timeouts_total Checkouts that timed out waiting for a connection.',
+              '# TYPE arndale_db_pool_timeouts_total counter',
+              f"arndale_db_pool_timeouts_total {checkouts['timeouts']}"]
+    for key in ('size', 'checked_out', 'checked_in', 'overflow'):
+        if key in pool:
+            lines += [f'# TYPE arndale_db_pool_{key} gauge', f'arndale_db_pool_{key} {pool[key]}']
+    return '\n'.join(lines) + '\n'
+
 # Helper function for authentication check
 def require_admin_login():
     """Redirect to login if not authenticated"""
     if 'admin_logged_in' not in flask_session:
-        return redirect(url_for('admin_login'))
+        return redirect(url_for('.admin_login'))
+
+
+@voting.route(f'{MEDIA_URL_PATH}/<path:filename>')
+def serve_media(filename):
+    """Serve photos, optionally offloaded to the web server; only hash-named ones are cached forever"""
+    media_root = get_media_root()
+    path = safe_join(media_root, filename)
+    if path is None or not os.path.isfile(path):
+        return jsonify({'error': 'Not found'}), 404
+
+    accel_prefix = current_app.config['MEDIA_X_ACCEL_REDIRECT_PREFIX']
+    if accel_prefix:
+        # nginx serves the file from its internal location
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{filename}"
+    else:
+        # send_file emits X-Sendfile itself when USE_X_SENDFILE is on
+        response = send_from_directory(media_root, filename)
+
+    if is_content_addressed(filename):
+        return cache_forever(response)
+    # Older photos such as voter_photos/voter_Yusuf.jpg can be replaced in place, so revalidate them
+    response.cache_control.no_cache = True
+    return response
+
+@voting.cli.command('gc-media')
+@click.option('--min-age', type=int, default=60, help='Keep files younger than this many minutes')
+def gc_media_command(min_age):
+    """Delete content-addressed photos no voter or candidate refers to."""
+    referenced = set()
+    for model in (Voter, Candidate):
+        for photo_url, renditions in db.session.query(model.photo_url, model.photo_renditions):
+            referenced.add(photo_url)
+            referenced.update(url for formats in (renditions or {}).values() for url in formats.values())
+
+    media_root = get_media_root()
+    cutoff = time.time() - min_age * 60
+    removed = 0
+    for directory, _, filenames in os.walk(media_root):
+        for filename in filenames:
+            # Only hash-named files belong to the store; anything else is left alone
+            if not is_content_addressed(filename):
+                continue
+            path = os.path.join(directory, filename)
+            url = f"{MEDIA_URL_PATH}/{os.path.relpath(path, media_root).replace(os.sep, '/')}"
+            if url not in referenced and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+    click.echo(f'Removed {removed} unreferenced media files')
+
+# Static assets are versioned by content hash so browsers can cache them forever
+@lru_cache(maxsize=None)
+def asset_version(filename):
+    with open(os.path.join(current_app.static_folder, filename), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+@voting.app_context_processor
+def inject_asset_url():
+    def asset_url(filename):
+        return url_for('static', filename=filename, v=asset_version(filename))
+    return {'asset_url': asset_url}
+
+@voting.after_app_request
+def cache_versioned_assets(response):
+    if request.endpoint == 'static' and request.args.get('v') and response.status_code == 200:
+        cache_forever(response)
+    return response
 
 
 # Routes
 # Admin Login Routes
-@app.route('/home')
+@voting.route('/home')
 def index():
     # Check if user is logged in
     if 'admin_logged_in' not in flask_session:
-        return redirect(url_for('admin_login'))
+        return redirect(url_for('.admin_login'))
     
-    init_database()  # Initialize only when route is called
-    active_session = get_active_session()
-    sessions = Session.query.order_by(Session.created_date.desc()).all()
-    voters = Voter.query.order_by(Voter.registered_date.desc()).all()
-    voter_stats = get_voter_stats()
-    
-    return render_template('index.html', 
-                         active_session=active_session,
-                         sessions=sessions,
-                         voters=voters,
-                         voter_stats=voter_stats)
+    # Sessions, voters and stats are fetched by the dashboard as each tab opens
+    return render_template('index.html', active_session=get_active_session())
 
 # Update the admin login route to set session
-@app.route('/', methods=['GET', 'POST'])
+@voting.route('/', methods=['GET', 'POST'])
 def admin_login():
     # If already logged in, redirect to admin dashboard
     if 'admin_logged_in' in flask_session:
-        return redirect(url_for('index'))
+        return redirect(url_for('.index'))
     
     if request.method == 'POST':
         username = request.form.get('username', '').strip()
@@ -264,21 +1468,40 @@ def admin_login():
             flask_session['login_time'] = datetime.now(timezone.utc).isoformat()
             
             flash('Login successful!', 'success')
-            return redirect(url_for('index'))
+            return redirect(url_for('.index'))
         else:
             flash('Invalid username or password', 'error')
     
     return render_template('login.html')
 
 # Add logout route
-@app.route('/logout')
+@voting.route('/logout')
 def logout():
     flask_session.clear()
     flash('You have been logged out successfully', 'success')
-    return redirect(url_for('admin_login'))
+    return redirect(url_for('.admin_login'))
 
 # Add session check API endpoint
-@app.route('/api/admin/check-session')
+def get_pool_status():
+    pool = db.engine.pool
+    status = {'profile': current_app.config['DATABASE_POOL_PROFILE'], 'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0)
+        })
+    return status
+
+@voting.route('/api/admin/pool-stats')
+def get_pool_stats():
+    """Connection pool state and checkout wait/overflow counters, for sizing the pool"""
+    if 'admin_logged_in' not in flask_session:
+        return jsonify({'error': 'Admin login required'}), 401
+    return jsonify({'pool': get_pool_status(), 'checkouts': pool_metrics.snapshot()})
+
+@voting.route('/api/admin/check-session')
 def check_admin_session():
     if 'admin_logged_in' in flask_session:
         return jsonify({'logged_in': True})
@@ -286,7 +1509,7 @@ def check_admin_session():
 
 
 # Session Management API
-@app.route('/api/sessions', methods=['GET', 'POST'])
+@voting.route('/api/sessions', methods=['GET', 'POST'])
 def handle_sessions():
     if request.method == 'POST':
         data = request.get_json()
@@ -315,6 +1538,7 @@ def handle_sessions():
             # If this is the first session, make it active
             if Session.query.count() == 1:
                 new_session.is_active = True
+                mark_active_session_changed()
                 db.session.commit()
             
             return jsonify({
@@ -332,7 +1556,10 @@ def handle_sessions():
             return jsonify({'error': f'Failed to create session: {str(e)}'}), 500
     
     else:  # GET request
-        sessions = Session.query.order_by(Session.created_date.desc()).all()
+        sessions = db.session.query(
+            Session.id, Session.name, Session.academic_year, Session.is_active,
+            Session.created_date, Session.description
+        ).order_by(Session.created_date.desc()).all()
         sessions_data = []
         for session in sessions:
             sessions_data.append({
@@ -345,7 +1572,7 @@ def handle_sessions():
             })
         return jsonify({'sessions': sessions_data})
 
-@app.route('/api/sessions/<int:session_id>/activate', methods=['POST'])
+@voting.route('/api/sessions/<int:session_id>/activate', methods=['POST'])
 def activate_session(session_id):
     session_to_activate = Session.query.get_or_404(session_id)
     
@@ -355,8 +1582,12 @@ def activate_session(session_id):
         
         # Activate the selected session
         session_to_activate.is_active = True
+        mark_active_session_changed()
         db.session.commit()
         
+        # Cached results of closed sessions are no longer final
+        invalidate_results_cache()
+        
         return jsonify({
             'success': True,
             'message': f'Session "{session_to_activate.name}" activated successfully'
@@ -365,14 +1596,16 @@ def activate_session(session_id):
         db.session.rollback()
         return jsonify({'error': f'Failed to activate session: {str(e)}'}), 500
 
-@app.route('/api/sessions/<int:session_id>', methods=['DELETE'])
+@voting.route('/api/sessions/<int:session_id>', methods=['DELETE'])
 def delete_session(session_id):
     session_to_delete = Session.query.get_or_404(session_id)
     session_name = session_to_delete.name
     
     try:
         db.session.delete(session_to_delete)
+        mark_active_session_changed()
         db.session.commit()
+        invalidate_results_cache([session_id])
         
         return jsonify({
             'success': True,
@@ -383,7 +1616,7 @@ def delete_session(session_id):
         return jsonify({'error': f'Failed to delete session: {str(e)}'}), 500
 
 # Position Management API
-@app.route('/api/positions', methods=['POST'])
+@voting.route('/api/positions', methods=['POST'])
 def create_position():
     data = request.get_json()
     name = data.get('name', '').strip()
@@ -415,6 +1648,8 @@ def create_position():
             voting_type=voting_type  # Add this
         )
         db.session.add(new_position)
+        bump_tally_version([session.id])
+        mark_ballot_changed()
         db.session.commit()
         
         return jsonify({
@@ -433,29 +1668,31 @@ def create_position():
         db.session.rollback()
         return jsonify({'error': f'Failed to create position: {str(e)}'}), 500
 
-@app.route('/api/sessions/<int:session_id>/positions')
+@voting.route('/api/sessions/<int:session_id>/positions')
+@sql_statement_limit(1)
 def get_session_positions(session_id):
-    positions = Position.query.filter_by(session_id=session_id).order_by(Position.display_order, Position.name).all()
+    positions = session_positions_query(session_id).all()
     positions_data = []
     
-    for position in positions:
-        candidate_count = Candidate.query.filter_by(position_id=position.id).count()
+    for position_id, name, display_order, description, candidate_count in positions:
         positions_data.append({
-            'id': position.id,
-            'name': position.name,
-            'display_order': position.display_order,
-            'description': position.description,
+            'id': position_id,
+            'name': name,
+            'display_order': display_order,
+            'description': description,
             'candidate_count': candidate_count
         })
     
     return jsonify({'positions': positions_data})
 
-@app.route('/api/positions/<int:position_id>', methods=['DELETE'])
+@voting.route('/api/positions/<int:position_id>', methods=['DELETE'])
 def delete_position(position_id):
     position_to_delete = Position.query.get_or_404(position_id)
     position_name = position_to_delete.name
     
     try:
+        bump_tally_version([position_to_delete.session_id])
+        mark_ballot_changed()
         db.session.delete(position_to_delete)
         db.session.commit()
         
@@ -468,7 +1705,7 @@ def delete_position(position_id):
         return jsonify({'error': f'Failed to delete position: {str(e)}'}), 500
 
 # Candidate Management API
-@app.route('/api/candidates', methods=['POST'])
+@voting.route('/api/candidates', methods=['POST'])
 def create_candidate():
     try:
         name = request.form.get('name', '').strip()
@@ -483,24 +1720,26 @@ def create_candidate():
         if not position:
             return jsonify({'error': 'Position not found'}), 404
         
-        # Handle photo upload to Cloudinary
-        photo_url = None
-        if 'photo' in request.files:
-            photo = request.files['photo']
-            if photo and photo.filename and allowed_file(photo.filename):
-                photo_url = upload_to_cloudinary(photo, 'candidates')
-                if not photo_url:
-                    return jsonify({'error': 'Failed to upload photo'}), 500
-        
         new_candidate = Candidate(
             name=name,
             position_id=position_id,
             grade=grade,
-            manifesto=manifesto,
-            photo_url=photo_url
+            manifesto=manifesto
         )
         db.session.add(new_candidate)
+        db.session.flush()
+        
+        # The photo is uploaded in the background; photo_url is set when it finishes
+        upload = None
+        photo = request.files.get('photo')
+        if photo and photo.filename and allowed_file(photo.filename):
+            upload = queue_photo_upload('candidate', new_candidate.id, photo)
+        
+        bump_tally_version([position.session_id])
+        mark_ballot_changed()
         db.session.commit()
+        if upload:
+            submit_photo_upload(upload.id)
         
         return jsonify({
             'success': True,
@@ -510,6 +1749,7 @@ def create_candidate():
                 'name': new_candidate.name,
                 'grade': new_candidate.grade,
                 'photo_url': new_candidate.photo_url,
+                'photo_status': 'pending' if upload else None,
                 'manifesto': new_candidate.manifesto
             }
         })
@@ -535,7 +1775,8 @@ def create_candidate():
 
 
 # Migration API endpoints
-@app.route('/api/migration/students')
+@voting.route('/api/migration/students')
+@sql_statement_limit(1, sample_args=('grade',))
 def get_students_by_grade():
     """Get students filtered by grade for migration"""
     grade = request.args.get('grade', '').strip()
@@ -543,7 +1784,9 @@ def get_students_by_grade():
     if not grade:
         return jsonify({'error': 'Grade parameter is required'}), 400
     
-    students = Voter.query.filter_by(grade=grade).order_by(Voter.name).all()
+    students = grade_roster_query(grade).all()
+    total = len(students)
+    voted_count = sum(1 for student in students if student.has_voted)
     
     students_data = []
     for student in students:
@@ -558,41 +1801,67 @@ def get_students_by_grade():
     
     return jsonify({
         'students': students_data,
-        'total': len(students_data),
-        'voted_count': len([s for s in students_data if s['has_voted']]),
-        'not_voted_count': len([s for s in students_data if not s['has_voted']])
+        'total': total,
+        'voted_count': voted_count,
+        'not_voted_count': total - voted_count
     })
 
-@app.route('/api/migration/migrate-students', methods=['POST'])
+def migrate_voters(voter_ids, progress=None):
+    """Reset voting status and issue fresh codes, one UPDATE and one commit per chunk"""
+    migrated_count = 0
+    for chunk in chunked(voter_ids, current_app.config['VOTER_IMPORT_CHUNK_SIZE']):
+        codes = dict(zip(chunk, Voter.generate_voter_codes(len(chunk))))
+        Voter.query.filter(Voter.id.in_(chunk)).update({
+            'has_voted': False,
+            'voter_code': case(codes, value=Voter.id)
+        }, synchronize_session=False)
+        db.session.commit()
+        
+        migrated_count += len(chunk)
+        if progress:
+            progress(migrated_count, len(voter_ids))
+    return migrated_count
+
+@voting.route('/api/migration/migrate-students', methods=['POST'])
 def migrate_students():
-    """Migrate students to a new session"""
+    """Migrate students to a new session, by ID list or by whole grade"""
     data = request.get_json()
     student_ids = data.get('student_ids', [])
+    grade = (data.get('grade') or '').strip()
     target_session_id = data.get('target_session_id')
     
-    if not student_ids or not target_session_id:
-        return jsonify({'error': 'Student IDs and target session ID are required'}), 400
+    if not (student_ids or grade) or not target_session_id:
+        return jsonify({'error': 'Student IDs or a grade, and a target session ID are required'}), 400
     
     target_session = Session.query.get(target_session_id)
     if not target_session:
         return jsonify({'error': 'Target session not found'}), 404
     
+    progress = {'migrated_count': 0}
     try:
-        migrated_count = 0
         errors = []
+        if grade:
+            voter_ids = [row[0] for row in db.session.query(Voter.id).filter_by(grade=grade).order_by(Voter.id)]
+        else:
+            requested_ids = []
+            for student_id in student_ids:
+                try:
+                    requested_ids.append(int(student_id))
+                except (TypeError, ValueError):
+                    errors.append(f"Student with ID {student_id} not found")
+            
+            existing_ids = set()
+            for chunk in chunked(set(requested_ids)):
+                existing_ids.update(row[0] for row in db.session.query(Voter.id).filter(Voter.id.in_(chunk)))
+            voter_ids = sorted(existing_ids)
+            errors.extend(f"Student with ID {student_id} not found"
+                          for student_id in requested_ids if student_id not in existing_ids)
         
-        for student_id in student_ids:
-            student = Voter.query.get(student_id)
-            if student:
-                # Reset voting status for the new session
-                student.has_voted = False
-                # You might want to generate a new voter code or keep the same
-                student.voter_code = Voter.generate_voter_code()  # Uncomment to generate new codes
-                migrated_count += 1
-            else:
-                errors.append(f"Student with ID {student_id} not found")
+        def report(done, total):
+            progress['migrated_count'] = done
+            current_app.logger.info('Migrating students to %s: %d/%d', target_session.name, done, total)
         
-        db.session.commit()
+        migrated_count = migrate_voters(voter_ids, progress=report)
         
         return jsonify({
             'success': True,
@@ -603,9 +1872,31 @@ def migrate_students():
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': f'Failed to migrate students: {str(e)}'}), 500
+        # Each chunk commits on its own, so earlier chunks stay migrated
+        return jsonify({
+            'error': f'Failed to migrate students: {str(e)}',
+            'migrated_count': progress['migrated_count']
+        }), 500
 
-@app.route('/api/migration/create-year-position', methods=['POST'])
+@voting.cli.command('migrate-grade')
+@click.argument('grade')
+@click.option('--session-id', type=int, required=True, help='Target session')
+def migrate_grade_command(grade, session_id):
+    """Migrate every student in GRADE to a session, resetting votes and codes."""
+    target_session = db.session.get(Session, session_id)
+    if not target_session:
+        raise click.ClickException(f'Session {session_id} not found')
+    
+    voter_ids = [row[0] for row in db.session.query(Voter.id).filter_by(grade=grade).order_by(Voter.id)]
+    with click.progressbar(length=len(voter_ids), label=f'Migrating {grade}') as bar:
+        last = [0]
+        def report(done, total):
+            bar.update(done - last[0])
+            last[0] = done
+        migrated_count = migrate_voters(voter_ids, progress=report)
+    click.echo(f'Migrated {migrated_count} students to {target_session.name}')
+
+@voting.route('/api/migration/create-year-position', methods=['POST'])
 def create_year_position():
     """Create a Class Representative position for a specific year"""
     data = request.get_json()
@@ -639,6 +1930,8 @@ def create_year_position():
         )
         
         db.session.add(new_position)
+        bump_tally_version([session.id])
+        mark_ballot_changed()
         db.session.commit()
         
         return jsonify({
@@ -667,33 +1960,54 @@ def create_year_position():
 
 
     
-@app.route('/api/positions/<int:position_id>/candidates')
+@voting.route('/api/positions/<int:position_id>/candidates')
+@sql_statement_limit(1)
 def get_position_candidates(position_id):
-    candidates = Candidate.query.filter_by(position_id=position_id).order_by(Candidate.name).all()
+    candidates = position_candidates_query(position_id).all()
     candidates_data = []
     
-    for candidate in candidates:
+    for candidate_id, name, grade, photo_url, photo_renditions, manifesto, votes in candidates:
         candidates_data.append({
-            'id': candidate.id,
-            'name': candidate.name,
-            'grade': candidate.grade,
-            'photo_url': candidate.photo_url,
-            'manifesto': candidate.manifesto,
-            'votes': candidate.votes
+            'id': candidate_id,
+            'name': name,
+            'grade': grade,
+            'photo_url': photo_url,
+            'photo_renditions': photo_renditions,
+            'manifesto': manifesto,
+            'votes': int(votes)
         })
     
     return jsonify({'candidates': candidates_data})
 
-@app.route('/api/candidates/<int:candidate_id>', methods=['DELETE'])
+@voting.route('/api/<any(candidates, voters):owner>/<int:owner_id>/photo')
+def get_photo_status(owner, owner_id):
+    """Report whether a background photo upload is pending, done or failed"""
+    model = Candidate if owner == 'candidates' else Voter
+    owner_type = 'candidate' if owner == 'candidates' else 'voter'
+    # A job the background worker never ran (e.g. a frozen serverless instance) is finished here
+    drain_photo_uploads(stale_photo_uploads().filter_by(owner_type=owner_type, owner_id=owner_id))
+    record = db.session.get(model, owner_id)
+    if not record:
+        return jsonify({'error': 'Not found'}), 404
+    
+    return jsonify({
+        'photo_url': record.photo_url,
+        'photo_renditions': record.photo_renditions,
+        'photo_status': photo_status(owner_type, owner_id)
+    })
+
+@voting.route('/api/candidates/<int:candidate_id>', methods=['DELETE'])
 def delete_candidate(candidate_id):
     candidate_to_delete = Candidate.query.get_or_404(candidate_id)
     candidate_name = candidate_to_delete.name
     
     try:
-        # Delete photo from Cloudinary if exists
-        if candidate_to_delete.photo_url:
-            delete_from_cloudinary(candidate_to_delete.photo_url)
+        # Delete photo renditions from storage if they exist
+        delete_photo_renditions(candidate_to_delete.photo_url, candidate_to_delete.photo_renditions)
+        PhotoUpload.query.filter_by(owner_type='candidate', owner_id=candidate_id, status='pending').delete()
         
+        bump_tally_version([candidate_to_delete.position.session_id])
+        mark_ballot_changed()
         db.session.delete(candidate_to_delete)
         db.session.commit()
         
@@ -706,7 +2020,7 @@ def delete_candidate(candidate_id):
         return jsonify({'error': f'Failed to delete candidate: {str(e)}'}), 500
 
 # Voter Management API
-@app.route('/api/voters', methods=['POST'])
+@voting.route('/api/voters', methods=['POST'])
 def create_voter():
     try:
         name = request.form.get('name', '').strip()
@@ -720,15 +2034,6 @@ def create_voter():
         if existing_voter:
             return jsonify({'error': f'Voter "{name}" is already registered'}), 400
         
-        # Handle photo upload to Cloudinary
-        photo_url = None
-        if 'photo' in request.files:
-            photo = request.files['photo']
-            if photo and photo.filename and allowed_file(photo.filename):
-                photo_url = upload_to_cloudinary(photo, 'voters')
-                if not photo_url:
-                    return jsonify({'error': 'Failed to upload photo'}), 500
-        
         # Generate unique student ID and voter code
         student_id = Voter.generate_student_id()
         voter_code = Voter.generate_voter_code()
@@ -737,12 +2042,21 @@ def create_voter():
             student_id=student_id,
             name=name,
             grade=grade,
-            photo_url=photo_url,
             voter_code=voter_code,
             registered_date=datetime.now(timezone.utc)
         )
         db.session.add(new_voter)
+        db.session.flush()
+        
+        # The photo is uploaded in the background; photo_url is set when it finishes
+        upload = None
+        photo = request.files.get('photo')
+        if photo and photo.filename and allowed_file(photo.filename):
+            upload = queue_photo_upload('voter', new_voter.id, photo)
+        
         db.session.commit()
+        if upload:
+            submit_photo_upload(upload.id)
         
         return jsonify({
             'success': True,
@@ -753,51 +2067,210 @@ def create_voter():
                 'name': new_voter.name,
                 'grade': new_voter.grade,
                 'voter_code': new_voter.voter_code,
-                'photo_url': new_voter.photo_url
+                'photo_url': new_voter.photo_url,
+                'photo_status': 'pending' if upload else None
             }
         })
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to register voter: {str(e)}'}), 500
     
-@app.route('/api/voters')
+def read_roster_rows(stream, roster_format):
+    """Yield (row number, record) pairs from a CSV or JSON lines stream without loading it all"""
+    text_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if roster_format == 'csv':
+        for row_number, record in enumerate(csv.DictReader(text_stream), start=1):
+            yield row_number, record
+    else:
+        for row_number, line in enumerate(text_stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield row_number, record if isinstance(record, dict) else None
+
+def import_roster_chunk(rows, errors):
+    """Insert one chunk of (row number, name, grade) rows and return how many were imported"""
+    existing_names = {row[0] for row in db.session.query(Voter.name).filter(
+        Voter.name.in_([name for _, name, _ in rows])
+    )}
+    new_rows = []
+    for row_number, name, grade in rows:
+        if name in existing_names:
+            errors.append({'row': row_number, 'name': name, 'error': f'Voter "{name}" is already registered'})
+        else:
+            new_rows.append((row_number, name, grade))
+    if not new_rows:
+        return 0
+
+    # Student IDs and voter codes are reserved for the whole chunk at once
+    student_ids = Voter.generate_student_ids(len(new_rows))
+    voter_codes = Voter.generate_voter_codes(len(new_rows))
+    registered_date = datetime.now(timezone.utc)
+    db.session.execute(db.insert(Voter), [{
+        'student_id': student_id,
+        'name': name,
+        'grade': grade,
+        'voter_code': voter_code,
+        'registered_date': registered_date,
+        'has_voted': False
+    } for (_, name, grade), student_id, voter_code in zip(new_rows, student_ids, voter_codes)])
+    db.session.commit()
+    return len(new_rows)
+
+@voting.route('/api/voters/import', methods=['POST'])
+def import_voters():
+    """Register a roster of voters from a CSV (name,grade header) or JSON lines upload"""
+    upload = request.files.get('file')
+    filename = (upload.filename if upload else '') or ''
+    roster_format = request.args.get('format', '').lower()
+    if not roster_format:
+        content_type = (upload.mimetype if upload else request.mimetype) or ''
+        is_json_lines = 'json' in content_type or filename.lower().endswith(('.jsonl', '.ndjson'))
+        roster_format = 'jsonl' if is_json_lines else 'csv'
+    if roster_format not in ('csv', 'jsonl'):
+        return jsonify({'error': 'Format must be csv or jsonl'}), 400
+
+    chunk_size = current_app.config['VOTER_IMPORT_CHUNK_SIZE']
+    errors = []
+    seen_names = set()
+    chunk = []
+    imported_count = 0
+    total_rows = 0
+
+    try:
+        for row_number, record in read_roster_rows(upload.stream if upload else request.stream, roster_format):
+            total_rows += 1
+            if record is None:
+                errors.append({'row': row_number, 'error': 'Row is not a valid record'})
+                continue
+
+            name = str(record.get('name') or '').strip()
+            grade = str(record.get('grade') or '').strip()
+            if not name or not grade:
+                errors.append({'row': row_number, 'name': name, 'error': 'Voter name and grade are required'})
+                continue
+            if name in seen_names:
+                errors.append({'row': row_number, 'name': name, 'error': f'Duplicate voter "{name}" in upload'})
+                continue
+            seen_names.add(name)
+
+            chunk.append((row_number, name, grade))
+            if len(chunk) >= chunk_size:
+                imported_count += import_roster_chunk(chunk, errors)
+                chunk = []
+
+        if chunk:
+            imported_count += import_roster_chunk(chunk, errors)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'error': f'Import stopped after {imported_count} voters: {str(e)}',
+            'imported_count': imported_count,
+            'errors': errors
+        }), 500
+
+    return jsonify({
+        'success': True,
+        'message': f'Imported {imported_count} of {total_rows} voters',
+        'imported_count': imported_count,
+        'failed_count': len(errors),
+        'errors': errors
+    })
+
+# Columns /api/voters can return; list views pick a subset with ?fields=
+VOTER_LIST_FIELDS = {
+    'id': Voter.id,
+    'student_id': Voter.student_id,
+    'name': Voter.name,
+    'grade': Voter.grade,
+    'photo_url': Voter.photo_url,
+    'photo_renditions': Voter.photo_renditions,
+    'voter_code': Voter.voter_code,
+    'registered_date': Voter.registered_date,
+    'has_voted': Voter.has_voted
+}
+
+def encode_voter_cursor(registered_date, voter_id):
+    raw = json.dumps([registered_date.isoformat(), voter_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_voter_cursor(cursor):
+    registered_date, voter_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    return datetime.fromisoformat(registered_date), int(voter_id)
+
+@voting.route('/api/voters/stats')
+def get_voters_stats():
+    try:
+        return jsonify(get_voter_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@voting.route('/api/voters')
+@sql_statement_limit(1)
 def get_voters():
-    voters = Voter.query.order_by(Voter.registered_date.desc()).all()
+    """List voters newest first, one keyset page at a time.
+
+    Query parameters: limit, cursor (next_cursor of the previous page), grade,
+    has_voted (true/false), name (prefix), student_id (prefix) and fields
+    (comma-separated subset of VOTER_LIST_FIELDS).
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+    fields = fields or list(VOTER_LIST_FIELDS)
+    unknown_fields = [field for field in fields if field not in VOTER_LIST_FIELDS]
+    if unknown_fields:
+        return jsonify({'error': f'Unknown fields: {", ".join(unknown_fields)}'}), 400
+
+    # id and registered_date are always read because they make up the cursor
+    columns = dict.fromkeys(['id', 'registered_date'] + fields)
+
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            after = decode_voter_cursor(cursor)
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    has_voted = request.args.get('has_voted', '').strip().lower()
+    rows = voter_page_query(
+        [VOTER_LIST_FIELDS[column].label(column) for column in columns], limit + 1,
+        grade=request.args.get('grade', '').strip(),
+        has_voted=True if has_voted in ('true', '1') else False if has_voted in ('false', '0') else None,
+        name=request.args.get('name', '').strip(),
+        student_id=request.args.get('student_id', '').strip(),
+        after=after
+    ).all()
+    next_cursor = encode_voter_cursor(rows[limit - 1].registered_date, rows[limit - 1].id) if len(rows) > limit else None
+
     voters_data = []
+    for row in rows[:limit]:
+        voter_data = {field: getattr(row, field) for field in fields}
+        if 'registered_date' in voter_data:
+            voter_data['registered_date'] = row.registered_date.strftime('%Y-%m-%d')
+        voters_data.append(voter_data)
     
-    for voter in voters:
-        voters_data.append({
-            'id': voter.id,
-            'student_id': voter.student_id,
-            'name': voter.name,
-            'grade': voter.grade,
-            'photo_url': voter.photo_url,
-            'voter_code': voter.voter_code,
-            'registered_date': voter.registered_date.strftime('%Y-%m-%d'),
-            'has_voted': voter.has_voted
-        })
-    
-    return jsonify({'voters': voters_data})
+    return jsonify({'voters': voters_data, 'next_cursor': next_cursor})
 
-@app.route('/api/voters/<int:voter_id>', methods=['DELETE'])
+@voting.route('/api/voters/<int:voter_id>', methods=['DELETE'])
 def delete_voter(voter_id):
     voter_to_delete = Voter.query.get_or_404(voter_id)
     voter_name = voter_to_delete.name
     
     try:
-        # Delete photo from Cloudinary if exists
-        if voter_to_delete.photo_url:
-            delete_from_cloudinary(voter_to_delete.photo_url)
-        
-        if voter_to_delete.has_voted:
-            # If the voter has voted, we need to remove their vote
-            VotingLog.query.filter_by(voter_id=voter_to_delete.id).delete()
-            # Optionally, decrement vote counts for candidates they voted for
-            votes = VotingLog.query.filter_by(voter_id=voter_to_delete.id).all()
-            for vote in votes:
-                candidate = Candidate.query.get(vote.candidate_id)
-                if candidate and candidate.votes > 0:
-                    candidate.votes -= 1
+        # Delete photo renditions from storage if they exist
+        delete_photo_renditions(voter_to_delete.photo_url, voter_to_delete.photo_renditions)
+        PhotoUpload.query.filter_by(owner_type='voter', owner_id=voter_id, status='pending').delete()
+        
+        # Remove the voter's votes from the tally and the ledger
+        retract_votes(voter_id=voter_to_delete.id)
         db.session.delete(voter_to_delete)
         db.session.commit()
         
@@ -810,7 +2283,7 @@ def delete_voter(voter_id):
         return jsonify({'error': f'Failed to delete voter: {str(e)}'}), 500
 
 # Voting API
-@app.route('/api/voting/verify', methods=['POST'])
+@voting.route('/api/voting/verify', methods=['POST'])
 def verify_voter():
     data = request.get_json()
     voter_code = data.get('voter_code', '').strip()
@@ -818,7 +2291,7 @@ def verify_voter():
     if not voter_code:
         return jsonify({'error': 'Voter code is required'}), 400
     
-    voter = Voter.query.filter_by(voter_code=voter_code).first()
+    voter = voter_by_code_query(voter_code).first()
     if not voter:
         return jsonify({'error': 'Invalid voter code'}), 404
     
@@ -832,6 +2305,7 @@ def verify_voter():
     # Store voter ID in session for voting
     flask_session['voter_id'] = voter.id
     flask_session['voter_name'] = voter.name
+    flask_session['voter_grade'] = voter.grade
     
     return jsonify({
         'success': True,
@@ -843,7 +2317,62 @@ def verify_voter():
         }
     })
 
-@app.route('/api/voting/positions')
+# Ballot cache - serialized ballots keyed by (session ID, grade). Every voter in a
+# grade gets the same ballot, so it is compiled once and served from memory.
+ballot_cache = {}
+ballot_cache_generation = {'value': 0}
+ballot_cache_lock = threading.Lock()
+
+def invalidate_ballot_cache():
+    with ballot_cache_lock:
+        ballot_cache_generation['value'] += 1
+        ballot_cache.clear()
+
+def mark_ballot_changed():
+    """Drop compiled ballots once the current transaction commits"""
+    db.session.info['ballot_changed'] = True
+
+def build_ballot(session_id, grade):
+    """Compile the ballot for one grade with a single eager-loaded query"""
+    positions = ballot_positions_query(session_id, grade).options(db.joinedload(Position.candidates)).all()
+
+    positions_data = []
+    for position in positions:
+        positions_data.append({
+            'id': position.id,
+            'name': position.name,
+            'description': position.description,
+            'grade_filter': position.grade_filter,
+            'voting_type': position.voting_type,
+            'candidates': [{
+                'id': candidate.id,
+                'name': candidate.name,
+                'grade': candidate.grade,
+                'photo_url': candidate.photo_url,
+                'photo_renditions': candidate.photo_renditions,
+                'manifesto': candidate.manifesto
+            } for candidate in sorted(position.candidates, key=lambda candidate: candidate.id)]
+        })
+
+    return current_app.json.dumps({'positions': positions_data}).encode('utf-8')
+
+def get_ballot(session_id, grade):
+    key = (session_id, grade)
+    now = time.monotonic()
+    with ballot_cache_lock:
+        generation = ballot_cache_generation['value']
+        cached = ballot_cache.get(key)
+    if cached and now - cached[0] < current_app.config['BALLOT_CACHE_TTL_SECONDS']:
+        return cached[1]
+
+    ballot = build_ballot(session_id, grade)
+    with ballot_cache_lock:
+        # Do not store a ballot compiled before an edit that committed meanwhile
+        if ballot_cache_generation['value'] == generation:
+            ballot_cache[key] = (now, ballot)
+    return ballot
+
+@voting.route('/api/voting/positions')
 def get_voting_positions():
     active_session = get_active_session()
     if not active_session:
@@ -853,45 +2382,16 @@ def get_voting_positions():
     if 'voter_id' not in flask_session:
         return jsonify({'error': 'Voter not verified'}), 401
     
-    voter_id = flask_session['voter_id']
-    voter = Voter.query.get(voter_id)
-    if not voter:
-        return jsonify({'error': 'Voter not found'}), 404
-    
-    # Get positions that are either for all grades or specifically for this voter's grade
-    positions = Position.query.filter_by(session_id=active_session.id).filter(
-        (Position.grade_filter.is_(None)) |  # Positions for all grades
-        (Position.grade_filter == voter.grade)  # Positions specifically for this grade
-    ).order_by(Position.display_order).all()
-    
-    positions_data = []
-    
-    for position in positions:
-        candidates = Candidate.query.filter_by(position_id=position.id).all()
-        candidates_data = []
-        
-        for candidate in candidates:
-            candidates_data.append({
-                'id': candidate.id,
-                'name': candidate.name,
-                'grade': candidate.grade,
-                'photo_url': candidate.photo_url,
-                'manifesto': candidate.manifesto,
-                'votes': candidate.votes
-            })
-        
-        positions_data.append({
-            'id': position.id,
-            'name': position.name,
-            'description': position.description,
-            'grade_filter': position.grade_filter,
-            'voting_type': position.voting_type,  # ADD THIS LINE - it's the missing field
-            'candidates': candidates_data
-        })
+    grade = flask_session.get('voter_grade')
+    if grade is None:
+        voter = Voter.query.get(flask_session['voter_id'])
+        if not voter:
+            return jsonify({'error': 'Voter not found'}), 404
+        grade = flask_session['voter_grade'] = voter.grade
     
-    return jsonify({'positions': positions_data})
+    return Response(get_ballot(active_session.id, grade), mimetype='application/json')
 
-@app.route('/api/voting/vote', methods=['POST'])
+@voting.route('/api/voting/vote', methods=['POST'])
 def cast_vote():
     data = request.get_json()
     position_id = data.get('position_id')
@@ -907,46 +2407,41 @@ def cast_vote():
         return jsonify({'error': 'Invalid vote data'}), 400
     
     try:
-        # Check if voter has already voted for this position
-        existing_vote = VotingLog.query.filter_by(
-            session_id=active_session.id,
-            position_id=position_id,
-            voter_id=voter_id
-        ).first()
-        
-        if existing_vote:
-            return jsonify({'error': 'You have already voted for this position'}), 400
-        
-        # Record the vote
         candidate = Candidate.query.get(candidate_id)
-        if not candidate:
+        if not candidate or str(candidate.position_id) != str(position_id):
             return jsonify({'error': 'Candidate not found'}), 404
+        candidate_name = candidate.name
         
-        # Update candidate vote count
-        candidate.votes += 1
-        
-        # Create voting log entry
+        # Create voting log entry - the unique index rejects a second vote for this position
         voting_log = VotingLog(
             session_id=active_session.id,
-            position_id=position_id,
-            candidate_id=candidate_id,
+            position_id=candidate.position_id,
+            candidate_id=candidate.id,
             voter_id=voter_id,
             vote_timestamp=datetime.now(timezone.utc)
         )
         db.session.add(voting_log)
+        db.session.flush()
+        
+        # Update the tally in the database, not on the loaded object
+        bump_tally({(active_session.id, candidate.position_id, candidate.id, 1): 1})
         
         db.session.commit()
+        record_startup_milestone('first_vote')
         
         return jsonify({
             'success': True,
-            'message': f'Vote cast successfully for {candidate.name}'
+            'message': f'Vote cast successfully for {candidate_name}'
         })
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'You have already voted for this position'}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to cast vote: {str(e)}'}), 500
 
 # Add this new API endpoint for casting two votes
-@app.route('/api/voting/vote-double', methods=['POST'])
+@voting.route('/api/voting/vote-double', methods=['POST'])
 def cast_double_vote():
     data = request.get_json()
     position_id = data.get('position_id')
@@ -966,63 +2461,49 @@ def cast_double_vote():
         return jsonify({'error': 'First and second choice cannot be the same'}), 400
     
     try:
-        # Check if voter has already voted for this position
-        existing_vote = MultiVotingLog.query.filter_by(
-            session_id=active_session.id,
-            position_id=position_id,
-            voter_id=voter_id
-        ).first()
-        
-        if existing_vote:
-            return jsonify({'error': 'You have already voted for this position'}), 400
-        
-        # Record first choice vote
         first_candidate = Candidate.query.get(first_choice_id)
-        if not first_candidate:
+        if not first_candidate or str(first_candidate.position_id) != str(position_id):
             return jsonify({'error': 'First choice candidate not found'}), 404
         
-        first_candidate.votes += 1
-        
-        # Create first choice voting log entry
-        first_vote = MultiVotingLog(
-            session_id=active_session.id,
-            position_id=position_id,
-            candidate_id=first_choice_id,
-            voter_id=voter_id,
-            vote_order=1,
-            vote_timestamp=datetime.now(timezone.utc)
-        )
-        db.session.add(first_vote)
-        
-        # Record second choice vote
         second_candidate = Candidate.query.get(second_choice_id)
-        if not second_candidate:
+        if not second_candidate or str(second_candidate.position_id) != str(position_id):
             return jsonify({'error': 'Second choice candidate not found'}), 404
         
-        second_candidate.votes += 1
-        
-        # Create second choice voting log entry
-        second_vote = MultiVotingLog(
-            session_id=active_session.id,
-            position_id=position_id,
-            candidate_id=second_choice_id,
-            voter_id=voter_id,
-            vote_order=2,
-            vote_timestamp=datetime.now(timezone.utc)
-        )
-        db.session.add(second_vote)
+        message = f'Votes cast successfully for {first_candidate.name} (1st) and {second_candidate.name} (2nd)'
+        
+        # Create first and second choice voting log entries - the unique index
+        # rejects a second ballot for this position
+        vote_timestamp = datetime.now(timezone.utc)
+        for vote_order, candidate in ((1, first_candidate), (2, second_candidate)):
+            db.session.add(MultiVotingLog(
+                session_id=active_session.id,
+                position_id=candidate.position_id,
+                candidate_id=candidate.id,
+                voter_id=voter_id,
+                vote_order=vote_order,
+                vote_timestamp=vote_timestamp
+            ))
+        db.session.flush()
+        
+        bump_tally({
+            (active_session.id, first_candidate.position_id, first_candidate.id, 1): 1,
+            (active_session.id, second_candidate.position_id, second_candidate.id, 2): 1
+        })
         
         db.session.commit()
         
         return jsonify({
             'success': True,
-            'message': f'Votes cast successfully for {first_candidate.name} (1st) and {second_candidate.name} (2nd)'
+            'message': message
         })
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'You have already voted for this position'}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to cast votes: {str(e)}'}), 500
     
-@app.route('/api/voting/complete', methods=['POST'])
+@voting.route('/api/voting/complete', methods=['POST'])
 def complete_voting():
     if 'voter_id' not in flask_session:
         return jsonify({'error': 'Voter not verified'}), 401
@@ -1033,11 +2514,15 @@ def complete_voting():
         # Mark voter as voted
         voter = Voter.query.get(voter_id)
         voter.has_voted = True
+        active_session = get_active_session()
+        if active_session:
+            bump_tally_version([active_session.id])
         db.session.commit()
         
         # Clear voting session
         flask_session.pop('voter_id', None)
         flask_session.pop('voter_name', None)
+        flask_session.pop('voter_grade', None)
         
         return jsonify({
             'success': True,
@@ -1047,8 +2532,133 @@ def complete_voting():
         db.session.rollback()
         return jsonify({'error': f'Failed to complete voting: {str(e)}'}), 500
 
+@voting.route('/api/voting/ballot', methods=['POST'])
+def submit_ballot():
+    """Cast every selection on the voter's ballot and complete voting in one transaction"""
+    data = request.get_json()
+
+    if 'voter_id' not in flask_session:
+        return jsonify({'error': 'Voter not verified'}), 401
+
+    # An empty list is a deliberate all-skipped ballot; a missing key is a malformed request
+    if not isinstance(data, dict) or not isinstance(data.get('selections'), list):
+        return jsonify({'error': 'Selections must be a list'}), 400
+    selections = data['selections']
+
+    voter = Voter.query.get(flask_session['voter_id'])
+    if not voter:
+        return jsonify({'error': 'Voter not found'}), 404
+
+    if voter.has_voted:
+        return jsonify({'error': 'This voter has already voted'}), 400
+
+    active_session = get_active_session()
+    if not active_session:
+        return jsonify({'error': 'No active election session'}), 400
+
+    # Load the voter's ballot: eligible positions and the candidates standing for them
+    positions = ballot_positions_query(active_session.id, voter.grade).all()
+    positions_by_id = {position.id: position for position in positions}
+
+    candidates_by_position = {position_id: set() for position_id in positions_by_id}
+    if positions_by_id:
+        candidate_rows = ballot_candidates_query(positions_by_id).all()
+        for candidate_id, position_id in candidate_rows:
+            candidates_by_position[position_id].add(candidate_id)
+
+    # Validate every selection before writing anything
+    ballot = []
+    seen_positions = set()
+    for selection in selections:
+        try:
+            position_id = int(selection.get('position_id'))
+        except (AttributeError, TypeError, ValueError):
+            return jsonify({'error': 'Invalid vote data'}), 400
+
+        position = positions_by_id.get(position_id)
+        if not position:
+            return jsonify({'error': f'Position {position_id} is not on your ballot'}), 400
+
+        if position_id in seen_positions:
+            return jsonify({'error': f'Duplicate selection for {position.name}'}), 400
+        seen_positions.add(position_id)
+
+        try:
+            if position.voting_type == 'double':
+                choices = [int(selection.get('first_choice_id')), int(selection.get('second_choice_id'))]
+                if choices[0] == choices[1]:
+                    return jsonify({'error': f'First and second choice cannot be the same for {position.name}'}), 400
+            else:
+                choices = [int(selection.get('candidate_id'))]
+        except (TypeError, ValueError):
+            return jsonify({'error': f'Invalid vote data for {position.name}'}), 400
+
+        if not all(choice in candidates_by_position[position_id] for choice in choices):
+            return jsonify({'error': f'Candidate not found for {position.name}'}), 404
+
+        ballot.append((position, choices))
+
+    try:
+        # Claim the voter first so two kiosks cannot submit the same ballot twice
+        claimed = Voter.query.filter(
+            Voter.id == voter.id,
+            Voter.has_voted.isnot(True)
+        ).update({Voter.has_voted: True}, synchronize_session=False)
+        if not claimed:
+            db.session.rollback()
+            return jsonify({'error': 'This voter has already voted'}), 400
+
+        vote_timestamp = datetime.now(timezone.utc)
+        for position, choices in ballot:
+            if position.voting_type == 'double':
+                for vote_order, candidate_id in enumerate(choices, start=1):
+                    db.session.add(MultiVotingLog(
+                        session_id=active_session.id,
+                        position_id=position.id,
+                        candidate_id=candidate_id,
+                        voter_id=voter.id,
+                        vote_order=vote_order,
+                        vote_timestamp=vote_timestamp
+                    ))
+            else:
+                db.session.add(VotingLog(
+                    session_id=active_session.id,
+                    position_id=position.id,
+                    candidate_id=choices[0],
+                    voter_id=voter.id,
+                    vote_timestamp=vote_timestamp
+                ))
+        # Positions already voted through the per-position endpoints fail the unique index here
+        db.session.flush()
+
+        bump_tally(Counter(
+            (active_session.id, position.id, candidate_id, vote_order)
+            for position, choices in ballot
+            for vote_order, candidate_id in enumerate(choices, start=1)
+        ))
+
+        db.session.commit()
+        record_startup_milestone('first_vote')
+
+        # Clear voting session
+        flask_session.pop('voter_id', None)
+        flask_session.pop('voter_name', None)
+        flask_session.pop('voter_grade', None)
+
+        return jsonify({
+            'success': True,
+            'message': 'Ballot submitted successfully',
+            'positions_voted': len(ballot)
+        })
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'You have already voted for one or more of these positions'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to submit ballot: {str(e)}'}), 500
+
 # Reset Votes API
-@app.route('/api/voting/reset-votes', methods=['POST'])
+@voting.route('/api/voting/reset-votes', methods=['POST'])
 def reset_all_votes():
     """Reset all votes for the active session"""
     active_session = get_active_session()
@@ -1056,19 +2666,12 @@ def reset_all_votes():
         return jsonify({'error': 'No active session found'}), 400
     
     try:
-        # Reset voter has_voted status
-        Voter.query.update({'has_voted': False})
+        # Reset every voter who has voted, including those who abstained on every position
+        # and so have no ledger rows; has_voted is not scoped to a session
+        Voter.query.filter(Voter.has_voted.is_(True)).update({'has_voted': False}, synchronize_session=False)
         
-        # Reset candidate vote counts
-        Candidate.query.update({'votes': 0})
-        
-        # Delete all voting logs for this session
-        VotingLog.query.filter_by(session_id=active_session.id).delete()
-        
-        # Delete all multi voting logs for this session
-        from sqlalchemy import text
-        db.session.execute(text('DELETE FROM multi_voting_log WHERE session_id = :session_id'), 
-                          {'session_id': active_session.id})
+        # Decrement vote counts for this session, then delete its voting logs
+        retract_votes(session_id=active_session.id)
         
         db.session.commit()
         
@@ -1085,22 +2688,14 @@ def reset_all_votes():
         return jsonify({'error': f'Failed to reset votes: {str(e)}'}), 500
 
 
-@app.route('/api/voting/reset-position/<int:position_id>', methods=['POST'])
+@voting.route('/api/voting/reset-position/<int:position_id>', methods=['POST'])
 def reset_position_votes(position_id):
     """Reset votes for a specific position"""
     position = Position.query.get_or_404(position_id)
     
     try:
-        # Reset candidate vote counts for this position
-        Candidate.query.filter_by(position_id=position_id).update({'votes': 0})
-        
-        # Delete voting logs for this position
-        VotingLog.query.filter_by(position_id=position_id).delete()
-        
-        # Delete multi voting logs for this position
-        from sqlalchemy import text
-        db.session.execute(text('DELETE FROM multi_voting_log WHERE position_id = :position_id'), 
-                          {'position_id': position_id})
+        # Decrement vote counts for this position, then delete its voting logs
+        retract_votes(session_id=position.session_id, position_id=position_id)
         
         db.session.commit()
         
@@ -1117,7 +2712,7 @@ def reset_position_votes(position_id):
         return jsonify({'error': f'Failed to reset position votes: {str(e)}'}), 500
 
 
-@app.route('/api/voting/reset-voter/<int:voter_id>', methods=['POST'])
+@voting.route('/api/voting/reset-voter/<int:voter_id>', methods=['POST'])
 def reset_voter(voter_id):
     """Reset voting status for a specific voter"""
     voter = Voter.query.get_or_404(voter_id)
@@ -1126,31 +2721,8 @@ def reset_voter(voter_id):
         # Reset voter status
         voter.has_voted = False
         
-        # Delete voting logs for this voter
-        VotingLog.query.filter_by(voter_id=voter_id).delete()
-        
-        # Delete multi voting logs for this voter
-        from sqlalchemy import text
-        db.session.execute(text('DELETE FROM multi_voting_log WHERE voter_id = :voter_id'), 
-                          {'voter_id': voter_id})
-        
-        # Decrement vote counts for candidates this voter voted for
-        # We need to handle this carefully to avoid negative votes
-        voting_logs = VotingLog.query.filter_by(voter_id=voter_id).all()
-        for log in voting_logs:
-            candidate = Candidate.query.get(log.candidate_id)
-            if candidate and candidate.votes > 0:
-                candidate.votes -= 1
-        
-        multi_voting_logs = db.session.execute(
-            text('SELECT candidate_id FROM multi_voting_log WHERE voter_id = :voter_id'),
-            {'voter_id': voter_id}
-        ).fetchall()
-        
-        for log in multi_voting_logs:
-            candidate = Candidate.query.get(log[0])
-            if candidate and candidate.votes > 0:
-                candidate.votes -= 1
+        # Decrement the tally for this voter's votes, then delete them from the ledger
+        retract_votes(voter_id=voter_id)
         
         db.session.commit()
         
@@ -1169,10 +2741,44 @@ def reset_voter(voter_id):
         return jsonify({'error': f'Failed to reset voter: {str(e)}'}), 500
     
 # Results API
-@app.route('/api/results/<int:session_id>')
-def get_session_results(session_id):
-    session = Session.query.get_or_404(session_id)
-    positions = Position.query.filter_by(session_id=session_id).order_by(Position.display_order).all()
+# Serialized results documents keyed by session ID. The active session is re-validated
+# against the tally version on every request; other sessions are closed, so their
+# documents are re-validated at most every ACTIVE_SESSION_CACHE_TTL_SECONDS. Whether a
+# session is closed is decided at read time, so one activated by another worker goes live here too.
+results_cache = {}
+results_cache_lock = threading.Lock()
+
+def invalidate_results_cache(session_ids=None):
+    with results_cache_lock:
+        if session_ids is None:
+            results_cache.clear()
+        else:
+            for session_id in session_ids:
+                results_cache.pop(session_id, None)
+
+def results_etag(session_id, version):
+    return f'results-{session_id}-{version}'
+
+def cached_results_response(cached):
+    """Return the cached document, or 304 Not Modified when the client already has it"""
+    if request.if_none_match.contains(cached['etag']):
+        response = Response(status=304)
+    else:
+        response = Response(cached['body'], mimetype='application/json')
+    response.set_etag(cached['etag'])
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def build_session_results(session):
+    positions = results_positions_query(session.id).all()
+    position_ids = [position.id for position in positions]
+    
+    # Load every candidate and the pre-aggregated tally once for the whole session
+    candidates_by_position = {position_id: [] for position_id in position_ids}
+    if position_ids:
+        for candidate in results_candidates_query(position_ids).all():
+            candidates_by_position[candidate.position_id].append(candidate)
+    candidate_votes = get_candidate_votes(session.id)
     
     results_data = {
         'session': {
@@ -1188,23 +2794,26 @@ def get_session_results(session_id):
     total_votes = 0
     
     for position in positions:
-        candidates = Candidate.query.filter_by(position_id=position.id).order_by(Candidate.votes.desc()).all()
-        position_votes = sum(candidate.votes for candidate in candidates)
+        candidates = sorted(candidates_by_position[position.id],
+                            key=lambda candidate: candidate_votes.get(candidate.id, 0), reverse=True)
+        position_votes = sum(candidate_votes.get(candidate.id, 0) for candidate in candidates)
         total_votes += position_votes
         total_candidates += len(candidates)
         
         candidates_data = []
         for i, candidate in enumerate(candidates):
-            percentage = (candidate.votes / position_votes * 100) if position_votes > 0 else 0
-            is_winner = (i == 0 and len(candidates) > 1 and candidate.votes > 0)
+            votes = candidate_votes.get(candidate.id, 0)
+            percentage = (votes / position_votes * 100) if position_votes > 0 else 0
+            is_winner = (i == 0 and len(candidates) > 1 and votes > 0)
             
             candidates_data.append({
                 'id': candidate.id,
                 'name': candidate.name,
                 'grade': candidate.grade,
                 'photo_url': candidate.photo_url,
+                'photo_renditions': candidate.photo_renditions,
                 'manifesto': candidate.manifesto,
-                'votes': candidate.votes,
+                'votes': votes,
                 'percentage': round(percentage, 1),
                 'is_winner': is_winner,
                 'rank': i + 1
@@ -1225,9 +2834,280 @@ def get_session_results(session_id):
         'average_votes_per_position': total_votes // total_positions if total_positions > 0 else 0
     }
     
-    return jsonify(results_data)
+    return results_data
+
+@voting.route('/api/results/<int:session_id>')
+def get_session_results(session_id):
+    with results_cache_lock:
+        cached = results_cache.get(session_id)
+    active_session = get_active_session()
+    closed = active_session is None or active_session.id != session_id
+    now = time.monotonic()
+    if (cached and closed
+            and now - cached['checked_at'] < current_app.config['ACTIVE_SESSION_CACHE_TTL_SECONDS']):
+        return cached_results_response(cached)
+
+    version = get_tally_version(session_id)
+    if cached and cached['version'] == version:
+        cached['checked_at'] = now
+        return cached_results_response(cached)
 
-@app.route('/api/voting/stats')
+    etag = results_etag(session_id, version)
+    if request.if_none_match.contains(etag):
+        return cached_results_response({'etag': etag})
+
+    session = Session.query.get_or_404(session_id)
+    cached = {
+        'version': version,
+        'etag': etag,
+        'checked_at': now,
+        'body': current_app.json.dumps(build_session_results(session)).encode('utf-8')
+    }
+    with results_cache_lock:
+        results_cache[session_id] = cached
+
+    return cached_results_response(cached)
+
+# Live results stream
+class ResultsBroadcaster:
+    """Polls one session's tally and turnout and fans the changes out to every open stream.
+
+    One background thread per session per process does the database work, so
+    the cost stays the same no matter how many dashboards are connected.
+    """
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.snapshot = None
+
+    def subscribe(self):
+        subscription = queue.Queue(maxsize=100)
+        with self.lock:
+            self.subscribers.add(subscription)
+            if self.snapshot is not None:
+                subscription.put(('snapshot', self.snapshot))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, args=(current_app._get_current_object(),),
+                                               daemon=True)
+                self.thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+
+    def publish(self, event_name, data):
+        with self.lock:
+            for subscription in self.subscribers:
+                try:
+                    subscription.put_nowait((event_name, data))
+                except queue.Full:
+                    # A client that fell behind gets a fresh snapshot instead of the missed deltas
+                    while not subscription.empty():
+                        subscription.get_nowait()
+                    subscription.put_nowait(('snapshot', self.snapshot))
+
+    def load_snapshot(self, version):
+        rows = session_tally_query(self.session_id).all()
+
+        candidates = {}
+        positions = {}
+        for position_id, candidate_id, votes in rows:
+            candidates[str(candidate_id)] = int(votes or 0)
+            positions[str(position_id)] = positions.get(str(position_id), 0) + int(votes or 0)
+
+        total_voters, voted = db.session.query(
+            func.count(Voter.id), func.sum(case((Voter.has_voted.is_(True), 1), else_=0))
+        ).one()
+        voted = int(voted or 0)
+
+        return {
+            'version': version,
+            'candidates': candidates,
+            'positions': positions,
+            'turnout': {
+                'total_voters': total_voters,
+                'voted': voted,
+                'not_voted': total_voters - voted,
+                'participation_rate': round(voted / total_voters * 100, 2) if total_voters > 0 else 0
+            }
+        }
+
+    def poll(self, force=False):
+        version = get_tally_version(self.session_id)
+        if not force and self.snapshot is not None and self.snapshot['version'] == version:
+            return
+
+        snapshot = self.load_snapshot(version)
+        previous = self.snapshot
+        self.snapshot = snapshot
+        if previous is None:
+            self.publish('snapshot', snapshot)
+            return
+
+        delta = {'version': version}
+        for key in ('candidates', 'positions'):
+            changed = {item: value for item, value in snapshot[key].items() if previous[key].get(item) != value}
+            # Rows removed by a reset are reported as zero
+            changed.update({item: 0 for item in previous[key] if item not in snapshot[key]})
+            if changed:
+                delta[key] = changed
+        if snapshot['turnout'] != previous['turnout']:
+            delta['turnout'] = snapshot['turnout']
+        if len(delta) > 1:
+            self.publish('delta', delta)
+
+    def run(self, app):
+        interval = 1.0 / app.config['RESULTS_STREAM_MAX_EVENTS_PER_SECOND']
+        resync_every = max(1, int(app.config['RESULTS_STREAM_HEARTBEAT_SECONDS'] / interval))
+        ticks = 0
+        with app.app_context():
+            while True:
+                with self.lock:
+                    if not self.subscribers:
+                        self.thread = None
+                        self.snapshot = None
+                        return
+                try:
+                    # Registrations do not bump the tally version, so turnout is resynced periodically
+                    self.poll(force=ticks % resync_every == 0)
+                except Exception as e:
+                    print(f"Results stream error for session {self.session_id}: {e}")
+                finally:
+                    db.session.remove()
+                ticks += 1
+                time.sleep(interval)
+
+results_broadcasters = {}
+
+# Open streams in this process, capped by RESULTS_STREAM_MAX_CONNECTIONS
+open_results_streams = {'count': 0}
+open_results_streams_lock = threading.Lock()
+
+def open_results_stream():
+    with open_results_streams_lock:
+        if open_results_streams['count'] >= current_app.config['RESULTS_STREAM_MAX_CONNECTIONS']:
+            return False
+        open_results_streams['count'] += 1
+        return True
+
+def close_results_stream():
+    with open_results_streams_lock:
+        open_results_streams['count'] -= 1
+results_broadcasters_lock = threading.Lock()
+
+def get_results_broadcaster(session_id):
+    with results_broadcasters_lock:
+        if session_id not in results_broadcasters:
+            results_broadcasters[session_id] = ResultsBroadcaster(session_id)
+        return results_broadcasters[session_id]
+
+@voting.route('/api/results/<int:session_id>/stream')
+def stream_session_results(session_id):
+    """Server-Sent Events: one snapshot, then tally and turnout deltas as votes commit"""
+    Session.query.get_or_404(session_id)
+    if not open_results_stream():
+        response = jsonify({'error': f'Live results are unavailable; poll /api/results/{session_id} instead'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+
+    broadcaster = get_results_broadcaster(session_id)
+    subscription = broadcaster.subscribe()
+    heartbeat = current_app.config['RESULTS_STREAM_HEARTBEAT_SECONDS']
+    closes_at = time.monotonic() + current_app.config['RESULTS_STREAM_MAX_SECONDS']
+
+    def events():
+        yield 'retry: 5000\n\n'
+        while True:
+            remaining = closes_at - time.monotonic()
+            if remaining <= 0:
+                return  # Frees the worker; the client reconnects and gets a fresh snapshot
+            try:
+                event_name, data = subscription.get(timeout=min(heartbeat, remaining))
+            except queue.Empty:
+                yield ': keep-alive\n\n'
+                continue
+            yield f"id: {data['version']}\nevent: {event_name}\ndata: {json.dumps(data)}\n\n"
+
+    response = Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs even when the client goes away before the first event is sent
+    response.call_on_close(lambda: (broadcaster.unsubscribe(subscription), close_results_stream()))
+    return response
+
+# Voting stats keyed by session ID. Entries are rebuilt when the tally version moves,
+# and at least every VOTING_STATS_CACHE_TTL_SECONDS to pick up roster changes.
+voting_stats_cache = {}
+voting_stats_cache_lock = threading.Lock()
+
+def build_voting_stats(active_session):
+    """Compute the stats document with two aggregate queries, independent of position count"""
+    # Grade-wise stats; overall turnout is the sum of the grades
+    voters_by_grade = turnout_by_grade_query().all()
+    
+    grade_stats = []
+    for grade, total, voted in voters_by_grade:
+        grade_stats.append({
+            'grade': grade,
+            'total': total,
+            'voted': voted,
+            'participation_rate': round(voted * 100.0 / total, 2) if total > 0 else 0
+        })
+    
+    total_voters = sum(row['total'] for row in grade_stats)
+    voted_count = sum(row['voted'] for row in grade_stats)
+    not_voted_count = total_voters - voted_count
+    participation_rate = (voted_count / total_voters * 100) if total_voters > 0 else 0
+    
+    # Position-wise stats: every position and candidate with its summed tally
+    rows = position_votes_query(active_session.id).all()
+    
+    position_stats = []
+    positions_by_id = {}
+    for position_id, position_name, candidate_id, candidate_name, votes in rows:
+        position = positions_by_id.get(position_id)
+        if position is None:
+            position = positions_by_id[position_id] = {
+                'id': position_id,
+                'name': position_name,
+                'total_votes': 0,
+                'candidates': []
+            }
+            position_stats.append(position)
+        if candidate_id is not None:
+            position['total_votes'] += int(votes)
+            position['candidates'].append({'id': candidate_id, 'name': candidate_name, 'votes': int(votes)})
+    
+    for position in position_stats:
+        total_votes = position['total_votes']
+        for candidate in position['candidates']:
+            percentage = (candidate['votes'] / total_votes * 100) if total_votes > 0 else 0
+            candidate['percentage'] = round(percentage, 2)
+    
+    return json.dumps({
+        'session': {
+            'id': active_session.id,
+            'name': active_session.name,
+            'academic_year': active_session.academic_year
+        },
+        'overall_stats': {
+            'total_voters': total_voters,
+            'voted': voted_count,
+            'not_voted': not_voted_count,
+            'participation_rate': round(participation_rate, 2)
+        },
+        'position_stats': position_stats,
+        'grade_stats': grade_stats
+    })
+
+@voting.route('/api/voting/stats')
+@sql_statement_limit(4)  # active session (when its cache is cold), tally version, two aggregates
 def get_voting_stats():
     """Get detailed voting statistics"""
     active_session = get_active_session()
@@ -1235,111 +3115,242 @@ def get_voting_stats():
         return jsonify({'error': 'No active session found'}), 400
     
     try:
-        # Basic stats
-        total_voters = Voter.query.count()
-        voted_count = Voter.query.filter_by(has_voted=True).count()
-        not_voted_count = total_voters - voted_count
-        participation_rate = (voted_count / total_voters * 100) if total_voters > 0 else 0
-        
-        # Position-wise stats
-        positions = Position.query.filter_by(session_id=active_session.id).all()
-        position_stats = []
-        
-        for position in positions:
-            candidates = Candidate.query.filter_by(position_id=position.id).all()
-            total_votes = sum(candidate.votes for candidate in candidates)
-            candidate_stats = []
-            
-            for candidate in candidates:
-                percentage = (candidate.votes / total_votes * 100) if total_votes > 0 else 0
-                candidate_stats.append({
-                    'id': candidate.id,
-                    'name': candidate.name,
-                    'votes': candidate.votes,
-                    'percentage': round(percentage, 2)
-                })
-            
-            position_stats.append({
-                'id': position.id,
-                'name': position.name,
-                'total_votes': total_votes,
-                'candidates': candidate_stats
-            })
-        
-        # Grade-wise stats
-        voters_by_grade = db.session.execute(
-            text('''
-                SELECT grade, 
-                       COUNT(*) as total,
-                       SUM(CASE WHEN has_voted = true THEN 1 ELSE 0 END) as voted,
-                       ROUND((SUM(CASE WHEN has_voted = true THEN 1 ELSE 0 END) * 100.0 / COUNT(*)), 2) as participation_rate
-                FROM voters
-                GROUP BY grade
-                ORDER BY grade
-            ''')
-        ).fetchall()
-        
-        grade_stats = []
-        for row in voters_by_grade:
-            grade_stats.append({
-                'grade': row[0],
-                'total': row[1],
-                'voted': row[2],
-                'participation_rate': row[3]
-            })
-        
-        return jsonify({
-            'session': {
-                'id': active_session.id,
-                'name': active_session.name,
-                'academic_year': active_session.academic_year
-            },
-            'overall_stats': {
-                'total_voters': total_voters,
-                'voted': voted_count,
-                'not_voted': not_voted_count,
-                'participation_rate': round(participation_rate, 2)
-            },
-            'position_stats': position_stats,
-            'grade_stats': grade_stats
-        })
+        version = get_tally_version(active_session.id)
+        now = time.monotonic()
+        with voting_stats_cache_lock:
+            cached = voting_stats_cache.get(active_session.id)
+        if (cached and cached[0] == version
+                and now - cached[1] < current_app.config['VOTING_STATS_CACHE_TTL_SECONDS']):
+            return Response(cached[2], mimetype='application/json')
+        
+        body = build_voting_stats(active_session)
+        with voting_stats_cache_lock:
+            voting_stats_cache[active_session.id] = (version, now, body)
+        return Response(body, mimetype='application/json')
         
     except Exception as e:
         return jsonify({'error': f'Failed to get stats: {str(e)}'}), 500
     
-# Test database connection
-@app.route('/test-db')
-def test_db():
+# Query plan checks - the builders the hot routes run, with representative parameters.
+# `flask check-query-plans` fails if the database would answer any of them with a full table scan.
+def hot_path_queries():
+    return {
+        'active session': active_session_query(),
+        'verify voter': voter_by_code_query('000000'),
+        'ballot': ballot_positions_query(1, 'Year 7').options(db.joinedload(Position.candidates)),
+        'ballot candidates': ballot_candidates_query([1, 2]),
+        'session positions': session_positions_query(1),
+        'position candidates': position_candidates_query(1),
+        'results positions': results_positions_query(1),
+        'results candidates': results_candidates_query([1, 2]),
+        'results candidate votes': candidate_votes_query(1),
+        'live results tally': session_tally_query(1),
+        'stats position votes': position_votes_query(1),
+        'stats turnout by grade': turnout_by_grade_query(),
+        'grade roster': grade_roster_query('Year 7'),
+        'voter page': voter_page_query([Voter.id, Voter.registered_date], 101),
+        'voter page after cursor': voter_page_query([Voter.id, Voter.registered_date], 101,
+                                                    after=(datetime(2024, 1, 1), 1)),
+        'voter page by grade': voter_page_query([Voter.id, Voter.registered_date], 101, grade='Year 7'),
+        'voter retraction': scope_ledger(VotingLog.query, VotingLog, voter_id=1),
+        'voter double vote retraction': scope_ledger(MultiVotingLog.query, MultiVotingLog, voter_id=1),
+        'position reset': scope_ledger(VotingLog.query, VotingLog, session_id=1, position_id=1),
+        'double vote position reset': scope_ledger(MultiVotingLog.query, MultiVotingLog, session_id=1, position_id=1),
+    }
+
+def find_full_scans(query):
+    """Return the plan lines where the database reads a whole table to answer the query"""
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    sql = str(query.statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+    if dialect == 'sqlite':
+        plan = [row[-1] for row in connection.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+        return [line for line in plan if line.startswith('SCAN ') and ' INDEX' not in line]
+    if dialect == 'postgresql':
+        # Tiny tables are cheaper to scan, so make the planner use an index whenever one applies
+        connection.execute(text('SET LOCAL enable_seqscan = off'))
+        plan = [row[0] for row in connection.execute(text(f'EXPLAIN {sql}'))]
+        return [line.strip() for line in plan if 'Seq Scan' in line]
+    if dialect == 'mysql':
+        plan = connection.execute(text(f'EXPLAIN {sql}')).mappings().all()
+        return [f"{row['table']}: type ALL" for row in plan if row['type'] == 'ALL']
+    raise click.ClickException(f'Query plan checks do not support {dialect}')
+
+@voting.cli.command('check-query-plans')
+def check_query_plans_command():
+    """EXPLAIN the hot-path queries and fail on any full table scan."""
+    failures = 0
     try:
-        # Test basic queries
-        session_count = Session.query.count()
-        voter_count = Voter.query.count()
-        position_count = Position.query.count()
-        candidate_count = Candidate.query.count()
-        
-        return jsonify({
-            'status': 'success',
-            'message': 'PostgreSQL database connection successful',
-            'counts': {
-                'sessions': session_count,
-                'voters': voter_count,
-                'positions': position_count,
-                'candidates': candidate_count
-            }
-        })
+        for name, query in hot_path_queries().items():
+            scans = find_full_scans(query)
+            if scans:
+                failures += 1
+                click.echo(f'FULL SCAN  {name}: ' + '; '.join(scans))
+            else:
+                click.echo(f'ok         {name}')
+    finally:
+        db.session.rollback()
+    if failures:
+        raise click.ClickException(f'{failures} hot-path queries fall back to a full table scan')
+
+@voting.cli.command('check-sql-budgets')
+def check_sql_budgets_command():
+    """Request every route with a @sql_statement_limit once, with cold caches, and fail on any overrun."""
+    active_session = db.session.query(Session.id).order_by(Session.is_active.desc(), Session.id).first()
+    position = db.session.query(Position.id).order_by(Position.id).first()
+    grade = db.session.query(Voter.grade).order_by(Voter.grade).first()
+    samples = {
+        'session_id': active_session and active_session[0],
+        'position_id': position and position[0],
+        'grade': grade and grade[0]
+    }
+    db.session.rollback()
+    
+    app = current_app._get_current_object()
+    client = app.test_client()
+    with client.session_transaction() as admin_session:
+        admin_session['admin_logged_in'] = True
+    
+    failures = 0
+    testing = app.testing
+    app.testing = True  # Makes check_sql_statement_limit raise
+    try:
+        for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+            view = app.view_functions[rule.endpoint]
+            limit = getattr(view, 'sql_statement_limit', None)
+            if limit is None or 'GET' not in rule.methods:
+                continue
+            names = list(rule.arguments) + list(view.sql_statement_sample_args)
+            missing = [name for name in names if samples.get(name) is None]
+            if missing:
+                click.echo(f'skipped    {rule.endpoint}: no sample {", ".join(missing)}')
+                continue
+            
+            # Worst case: nothing cached in this process
+            invalidate_active_session()
+            invalidate_ballot_cache()
+            invalidate_results_cache()
+            with voting_stats_cache_lock:
+                voting_stats_cache.clear()
+            
+            values = {name: samples[name] for name in names}
+            with app.test_request_context():
+                url = url_for(rule.endpoint, **values)
+            try:
+                response = client.get(url)
+            except AssertionError as e:
+                failures += 1
+                click.echo(f'OVER       {e}')
+                continue
+            click.echo(f'ok         {rule.endpoint} (limit {limit}, HTTP {response.status_code})')
+    finally:
+        app.testing = testing
+    if failures:
+        raise click.ClickException(f'{failures} routes exceed their SQL statement limit')
+
+# Metrics for Prometheus to scrape
+@voting.route('/metrics')
+def metrics():
+    token = current_app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    return Response(render_prometheus_metrics(), mimetype='text/plain; version=0.0.4')
+
+# Readiness probe: one round trip to the database plus the pool state, no table scans
+@voting.route('/ready')
+@voting.route('/test-db')
+def readiness():
+    try:
+        db.session.execute(text('SELECT 1'))
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'status': 'error',
-            'message': f'Database connection failed: {str(e)}'
-        }), 500
+            'message': f'Database connection failed: {str(e)}',
+            'pool': get_pool_status()
+        }), 503
+
+    # Re-read the version while it is behind, so a `flask db-upgrade` run elsewhere makes this worker ready
+    schema_version = current_app.extensions['schema_version']
+    if schema_version is not None and schema_version < LATEST_SCHEMA_VERSION:
+        schema_version = current_app.extensions['schema_version'] = get_schema_version()
+    if schema_version is not None and schema_version < LATEST_SCHEMA_VERSION:
+        return jsonify({
+            'status': 'error',
+            'message': f'Database schema is at version {schema_version}, expected {LATEST_SCHEMA_VERSION}',
+            'pool': get_pool_status()
+        }), 503
+
+    return jsonify({'status': 'ready', 'pool': get_pool_status(), 'pool_timeouts': pool_metrics.snapshot()['timeouts']})
 
 # Health check
-@app.route('/health')
+@voting.route('/health')
 def health():
-    return jsonify({'status': 'healthy', 'message': 'Arndale Voting System is running'})
+    return jsonify({
+        'status': 'healthy',
+        'message': 'Arndale Voting System is running',
+        'startup': current_app.extensions['startup_timing'],
+        'schema': {'version': current_app.extensions['schema_version'], 'latest': LATEST_SCHEMA_VERSION}
+    })
+
+def elapsed_ms(start, end=None):
+    return round(((end or time.perf_counter()) - start) * 1000, 1)
+
+def record_startup_milestone(name):
+    """Record how long after process start something first happened, e.g. the first vote"""
+    timing = current_app.extensions['startup_timing']
+    key = f'{name}_ms'
+    if key not in timing:
+        timing[key] = elapsed_ms(startup_started)
+
+@voting.before_app_request
+def record_first_request():
+    record_startup_milestone('first_request')
+
+def create_app(config=None):
+    """Build the app. Migrations are not part of startup; run `flask db-upgrade` when deploying"""
+    started = time.perf_counter()
+    # Create Flask app with explicit template and static paths
+    app = Flask(__name__,
+                template_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates'),
+                static_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static'))
+    configure_app(app)
+    if config:
+        app.config.update(config)
+    configured = time.perf_counter()
+    
+    db.init_app(app)
+    extensions_ready = time.perf_counter()
+    
+    app.register_blueprint(voting)
+    routes_ready = time.perf_counter()
+    
+    app.extensions['schema_version'] = None
+    with app.app_context():
+        if app.config['MIGRATE_ON_STARTUP']:
+            migrate_database()
+        if app.config['SCHEMA_CHECK_ON_STARTUP'] or app.config['MIGRATE_ON_STARTUP']:
+            app.extensions['schema_version'] = get_schema_version()
+            if app.extensions['schema_version'] < LATEST_SCHEMA_VERSION:
+                print(f"WARNING: Database schema is at version {app.extensions['schema_version']}, "
+                      f"expected {LATEST_SCHEMA_VERSION}. Run `flask --app api.index db-upgrade`.")
+    finished = time.perf_counter()
+    
+    app.extensions['startup_timing'] = {
+        'imports_ms': elapsed_ms(startup_started, imports_finished),
+        'config_ms': elapsed_ms(started, configured),
+        'extensions_ms': elapsed_ms(configured, extensions_ready),
+        'routes_ms': elapsed_ms(extensions_ready, routes_ready),
+        'schema_check_ms': elapsed_ms(routes_ready, finished),
+        'total_ms': elapsed_ms(startup_started, finished)
+    }
+    print('Startup timing: ' + ', '.join(f'{key}={value}' for key, value in app.extensions['startup_timing'].items()))
+    return app
 
 # Vercel handler - THIS MUST BE AT THE END
-app
+app = create_app()
 
 if __name__ == "__main__":
+    with app.app_context():
+        migrate_database()
     app.run(port=5000)
@@ -0,0 +1,257 @@
+"""Election-day load test for the Arndale Voting System.
+
+Seeds a synthetic school into an empty database, then drives the kiosk flow
+(verify -> positions -> vote / vote-double -> complete) from many concurrent
+simulated kiosks and prints throughput, latency percentiles and SQL statements
+per request as JSON.
+
+    python benchmark.py                                  # temporary SQLite database
+    python benchmark.py --database-url postgresql://...  # an empty Postgres database
+    python benchmark.py --kiosks 32 --voters-per-grade 500 --output run.json
+    python benchmark.py --ballot                         # one POST /api/voting/ballot per voter
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Election-day load test')
+    parser.add_argument('--database-url', help='Empty database to seed (default: a temporary SQLite file)')
+    parser.add_argument('--grades', type=int, default=6, help='Year groups, named Year 7, Year 8, ...')
+    parser.add_argument('--voters-per-grade', type=int, default=200)
+    parser.add_argument('--single-positions', type=int, default=4, help='School-wide single-choice positions')
+    parser.add_argument('--double-positions', type=int, default=2, help='School-wide first/second choice positions')
+    parser.add_argument('--candidates', type=int, default=4, help='Candidates per position')
+    parser.add_argument('--grade-positions', action='store_true', default=True,
+                        help='Add a class representative position per grade (default)')
+    parser.add_argument('--no-grade-positions', dest='grade_positions', action='store_false')
+    parser.add_argument('--kiosks', type=int, default=16, help='Concurrent simulated kiosks')
+    parser.add_argument('--ballot', action='store_true', help='Submit each ballot in one request instead of per position')
+    parser.add_argument('--seed', type=int, default=2024, help='Random seed for candidate choices')
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    parser.add_argument('--keep-database', action='store_true', help='Keep the temporary SQLite database afterwards')
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Point the app at the benchmark database before it is imported"""
+    database_url, temporary_path = args.database_url, None
+    if not database_url:
+        handle, temporary_path = tempfile.mkstemp(prefix='arndale-benchmark-', suffix='.db')
+        os.close(handle)
+        database_url = f'sqlite:///{temporary_path}'
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['SCHEMA_CHECK_ON_STARTUP'] = 'false'
+    return database_url, temporary_path
+
+
+def seed_school(index, args):
+    """Create one active session, its positions and candidates, and every voter"""
+    db = index.db
+    index.migrate_database()
+    if db.session.query(index.Session.id).first():
+        sys.exit('The benchmark database must be empty; pass --database-url for a fresh database')
+
+    session = index.Session(name='Benchmark Election', academic_year='2024-2025', is_active=True)
+    db.session.add(session)
+    db.session.flush()
+
+    grades = [f'Year {7 + i}' for i in range(args.grades)]
+    positions = []
+    for i in range(args.single_positions):
+        positions.append(index.Position(name=f'Single {i + 1}', session_id=session.id, display_order=len(positions)))
+    for i in range(args.double_positions):
+        positions.append(index.Position(name=f'Double {i + 1}', session_id=session.id, display_order=len(positions),
+                                        voting_type='double'))
+    if args.grade_positions:
+        for grade in grades:
+            positions.append(index.Position(name=f'{grade} Representative', session_id=session.id,
+                                            display_order=len(positions), grade_filter=grade))
+    db.session.add_all(positions)
+    db.session.flush()
+
+    db.session.add_all(
+        index.Candidate(name=f'{position.name} Candidate {i + 1}', position_id=position.id,
+                        grade=position.grade_filter or random.choice(grades))
+        for position in positions for i in range(args.candidates)
+    )
+
+    voter_codes = []
+    for grade in grades:
+        codes = index.Voter.generate_voter_codes(args.voters_per_grade)
+        student_ids = index.Voter.generate_student_ids(args.voters_per_grade)
+        db.session.execute(db.insert(index.Voter), [
+            {'student_id': student_id, 'name': f'{grade} Student {n + 1}', 'grade': grade,
+             'voter_code': code, 'has_voted': False}
+            for n, (student_id, code) in enumerate(zip(student_ids, codes))
+        ])
+        voter_codes.extend(codes)
+    db.session.commit()
+    index.invalidate_active_session()
+    return voter_codes, len(positions)
+
+
+class Recorder:
+    """Collects per-endpoint latencies and SQL statement counts across kiosk threads"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, seconds, queries, ok):
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            if queries is not None:
+                self.queries[endpoint].append(queries)
+            if not ok:
+                self.errors[endpoint] += 1
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def run_kiosk(app, voter_codes, recorder, args, rng):
+    client = app.test_client()
+
+    def call(endpoint, method, url, payload=None):
+        started = time.perf_counter()
+        response = client.open(url, method=method, json=payload)
+        elapsed = time.perf_counter() - started
+        queries = response.headers.get('X-Benchmark-SQL-Statements')
+        recorder.record(endpoint, elapsed, int(queries) if queries is not None else None, response.status_code == 200)
+        return response
+
+    while True:
+        try:
+            voter_code = voter_codes.pop()
+        except IndexError:
+            return
+
+        if call('verify', 'POST', '/api/voting/verify', {'voter_code': voter_code}).status_code != 200:
+            continue
+        ballot = call('positions', 'GET', '/api/voting/positions').get_json()
+
+        selections = []
+        for position in ballot['positions']:
+            candidate_ids = [candidate['id'] for candidate in position['candidates']]
+            if not candidate_ids:
+                continue
+            if position['voting_type'] == 'double' and len(candidate_ids) > 1:
+                first, second = rng.sample(candidate_ids, 2)
+                selection = {'position_id': position['id'], 'first_choice_id': first, 'second_choice_id': second}
+                if not args.ballot:
+                    call('vote-double', 'POST', '/api/voting/vote-double', selection)
+            else:
+                selection = {'position_id': position['id'], 'candidate_id': rng.choice(candidate_ids)}
+                if not args.ballot:
+                    call('vote', 'POST', '/api/voting/vote', selection)
+            selections.append(selection)
+
+        if args.ballot:
+            call('ballot', 'POST', '/api/voting/ballot', {'selections': selections})
+        else:
+            call('complete', 'POST', '/api/voting/complete')
+
+
+def build_report(args, database_url, recorder, duration, voters, position_count, dialect):
+    endpoints = {}
+    total_requests = 0
+    for endpoint, latencies in sorted(recorder.latencies.items()):
+        latencies.sort()
+        queries = recorder.queries.get(endpoint, [])
+        total_requests += len(latencies)
+        endpoints[endpoint] = {
+            'requests': len(latencies),
+            'errors': recorder.errors.get(endpoint, 0),
+            'throughput_rps': round(len(latencies) / duration, 1),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'sql_statements_mean': round(sum(queries) / len(queries), 2) if queries else None,
+            'sql_statements_max': max(queries) if queries else None
+        }
+
+    return {
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'database': dialect,
+        'database_url': database_url.split('@')[-1],
+        'config': {
+            'grades': args.grades,
+            'voters_per_grade': args.voters_per_grade,
+            'positions': position_count,
+            'candidates_per_position': args.candidates,
+            'kiosks': args.kiosks,
+            'mode': 'ballot' if args.ballot else 'per-position'
+        },
+        'totals': {
+            'voters': voters,
+            'requests': total_requests,
+            'errors': sum(recorder.errors.values()),
+            'duration_s': round(duration, 3),
+            'throughput_rps': round(total_requests / duration, 1),
+            'voters_per_second': round(voters / duration, 1)
+        },
+        'endpoints': endpoints
+    }
+
+
+def main():
+    args = parse_args()
+    database_url, temporary_path = configure_environment(args)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from api import index
+    from flask import g
+
+    app = index.app
+
+    @app.after_request
+    def report_sql_statements(response):
+        response.headers['X-Benchmark-SQL-Statements'] = str(g.get('sql_statement_count', 0))
+        return response
+
+    with app.app_context():
+        voter_codes, position_count = seed_school(index, args)
+        dialect = index.db.engine.dialect.name
+    voters = len(voter_codes)
+    random.Random(args.seed).shuffle(voter_codes)
+
+    recorder = Recorder()
+    kiosks = [
+        threading.Thread(target=run_kiosk, args=(app, voter_codes, recorder, args, random.Random(args.seed + i)))
+        for i in range(args.kiosks)
+    ]
+    started = time.perf_counter()
+    for kiosk in kiosks:
+        kiosk.start()
+    for kiosk in kiosks:
+        kiosk.join()
+    duration = time.perf_counter() - started
+
+    report = build_report(args, database_url, recorder, duration, voters, position_count, dialect)
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+    if temporary_path and not args.keep_database:
+        with app.app_context():
+            index.db.engine.dispose()
+        os.remove(temporary_path)
+
+
+if __name__ == '__main__':
+    main()
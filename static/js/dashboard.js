@@ -0,0 +1,1641 @@
+// Photo thumbnail as WebP with a JPEG fallback, or the original URL for photos uploaded before renditions existed
+function photoHtml(record, classes, alt) {
+    const thumbnail = record.photo_renditions && record.photo_renditions.thumbnail;
+    if (!thumbnail) {
+        return `<img src="${record.photo_url}" class="${classes}" alt="${alt}" loading="lazy">`;
+    }
+    return `<picture>
+        <source type="image/webp" srcset="${thumbnail.webp}">
+        <img src="${thumbnail.jpeg}" class="${classes}" alt="${alt}" loading="lazy">
+    </picture>`;
+}
+
+// Reset Votes Functions
+let resetModal = null;
+let positionsList = [];
+let votersList = [];
+
+function showResetModal() {
+    resetModal = document.getElementById('resetModal');
+    resetModal.classList.remove('hidden');
+    
+    // Load positions and voters for selection
+    loadPositionsForReset();
+    loadVotersForReset();
+    
+    // Show/hide selection based on radio buttons
+    document.querySelectorAll('input[name="resetOption"]').forEach(radio => {
+        radio.addEventListener('change', function() {
+            const positionSelect = document.getElementById('positionSelectContainer');
+            const voterSelect = document.getElementById('voterSelectContainer');
+            
+            positionSelect.classList.add('hidden');
+            voterSelect.classList.add('hidden');
+            
+            if (this.value === 'position') {
+                positionSelect.classList.remove('hidden');
+            } else if (this.value === 'voter') {
+                voterSelect.classList.remove('hidden');
+            }
+        });
+    });
+}
+
+function hideResetModal() {
+    if (resetModal) {
+        resetModal.classList.add('hidden');
+    }
+}
+
+async function loadPositionsForReset() {
+    try {
+        const activeSession = await getActiveSession();
+        if (!activeSession) return;
+        
+        const data = await apiCall(`/api/sessions/${activeSession.id}/positions`);
+        positionsList = data.positions;
+        
+        const select = document.getElementById('positionSelect');
+        select.innerHTML = positionsList.map(pos => 
+            `<option value="${pos.id}">${pos.name}</option>`
+        ).join('');
+        
+    } catch (error) {
+        console.error('Failed to load positions:', error);
+    }
+}
+
+async function loadVotersForReset() {
+    try {
+        votersList = await fetchAllVoters({ fields: 'id,name,student_id' });
+        
+        const select = document.getElementById('voterSelect');
+        select.innerHTML = votersList.map(voter => 
+            `<option value="${voter.id}">${voter.name} (${voter.student_id})</option>`
+        ).join('');
+        
+    } catch (error) {
+        console.error('Failed to load voters:', error);
+    }
+}
+
+async function getActiveSession() {
+    try {
+        const response = await fetch('/api/sessions');
+        const data = await response.json();
+        return data.sessions.find(s => s.is_active);
+    } catch (error) {
+        console.error('Failed to get active session:', error);
+        return null;
+    }
+}
+
+async function confirmReset() {
+    const resetOption = document.querySelector('input[name="resetOption"]:checked').value;
+    
+    if (resetOption === 'position') {
+        const positionId = document.getElementById('positionSelect').value;
+        if (!positionId) {
+            alert('Please select a position');
+            return;
+        }
+        
+        if (!confirm(`Are you sure you want to reset ALL votes for this position? This cannot be undone.`)) {
+            return;
+        }
+        
+        try {
+            const data = await apiCall(`/api/voting/reset-position/${positionId}`, {
+                method: 'POST'
+            });
+            
+            alert(`SUCCESS: ${data.message}`);
+            updateStatus(data.message);
+            hideResetModal();
+            
+            // Reload relevant data
+            loadSessions();
+            loadVoters();
+            
+        } catch (error) {
+            alert(`ERROR: ${error.message}`);
+        }
+        
+    } else if (resetOption === 'voter') {
+        const voterId = document.getElementById('voterSelect').value;
+        if (!voterId) {
+            alert('Please select a voter');
+            return;
+        }
+        
+        const voter = votersList.find(v => v.id == voterId);
+        if (!voter) return;
+        
+        if (!confirm(`Are you sure you want to reset voting status for ${voter.name}? This cannot be undone.`)) {
+            return;
+        }
+        
+        try {
+            const data = await apiCall(`/api/voting/reset-voter/${voterId}`, {
+                method: 'POST'
+            });
+            
+            alert(`SUCCESS: ${data.message}`);
+            updateStatus(data.message);
+            hideResetModal();
+            
+            // Reload relevant data
+            loadVoters();
+            
+        } catch (error) {
+            alert(`ERROR: ${error.message}`);
+        }
+        
+    } else {
+        // Reset all votes
+        if (!confirm(`WARNING: This will reset ALL votes for the active session.\n\n• All voter status will be reset to "Not Voted"\n• All candidate vote counts will be set to 0\n• All voting records will be deleted\n\nThis action cannot be undone!`)) {
+            return;
+        }
+        
+        try {
+            const data = await apiCall('/api/voting/reset-votes', {
+                method: 'POST'
+            });
+            
+            alert(`SUCCESS: ${data.message}\n\nAll votes have been reset successfully.`);
+            updateStatus(data.message);
+            hideResetModal();
+            
+            // Reload all data
+            loadSessions();
+            loadVoters();
+            
+        } catch (error) {
+            alert(`ERROR: ${error.message}`);
+        }
+    }
+}
+
+// Add stats viewing functionality
+async function showVotingStats() {
+    try {
+        const data = await apiCall('/api/voting/stats');
+        
+        // Create a modal to display stats
+        const statsHtml = `
+            <div class="fixed inset-0 bg-gray-600 bg-opacity-50 overflow-y-auto h-full w-full z-50">
+                <div class="relative top-10 mx-auto p-5 border w-11/12 md:w-3/4 lg:w-1/2 shadow-lg rounded-md bg-white">
+                    <div class="flex justify-between items-center mb-4">
+                        <h3 class="text-lg font-bold text-gray-900">Voting Statistics</h3>
+                        <button onclick="closeStatsModal()" class="text-gray-400 hover:text-gray-600">
+                            &times;
+                        </button>
+                    </div>
+                    
+                    <div class="space-y-4">
+                        <!-- Session Info -->
+                        <div class="bg-blue-50 p-3 rounded">
+                            <h4 class="font-semibold text-blue-800">Session: ${data.session.name}</h4>
+                            <p class="text-blue-600">Academic Year: ${data.session.academic_year}</p>
+                        </div>
+                        
+                        <!-- Overall Stats -->
+                        <div class="grid grid-cols-2 md:grid-cols-4 gap-2">
+                            <div class="bg-gray-100 p-3 rounded text-center">
+                                <div class="text-2xl font-bold">${data.overall_stats.total_voters}</div>
+                                <div class="text-sm text-gray-600">Total Voters</div>
+                            </div>
+                            <div class="bg-green-100 p-3 rounded text-center">
+                                <div class="text-2xl font-bold text-green-700">${data.overall_stats.voted}</div>
+                                <div class="text-sm text-green-600">Voted</div>
+                            </div>
+                            <div class="bg-orange-100 p-3 rounded text-center">
+                                <div class="text-2xl font-bold text-orange-700">${data.overall_stats.not_voted}</div>
+                                <div class="text-sm text-orange-600">Not Voted</div>
+                            </div>
+                            <div class="bg-purple-100 p-3 rounded text-center">
+                                <div class="text-2xl font-bold text-purple-700">${data.overall_stats.participation_rate}%</div>
+                                <div class="text-sm text-purple-600">Participation</div>
+                            </div>
+                        </div>
+                        
+                        <!-- Grade-wise Stats -->
+                        <div class="mt-4">
+                            <h4 class="font-semibold text-gray-700 mb-2">Participation by Grade</h4>
+                            <div class="space-y-2">
+                                ${data.grade_stats.map(grade => `
+                                    <div class="flex items-center justify-between bg-gray-50 p-2 rounded">
+                                        <span class="font-medium">${grade.grade}</span>
+                                        <div class="flex items-center space-x-4">
+                                            <span class="text-sm">${grade.voted}/${grade.total} voted</span>
+                                            <span class="text-sm font-semibold ${grade.participation_rate >= 50 ? 'text-green-600' : 'text-orange-600'}">
+                                                ${grade.participation_rate}%
+                                            </span>
+                                        </div>
+                                    </div>
+                                `).join('')}
+                            </div>
+                        </div>
+                        
+                        <!-- Position-wise Stats -->
+                        <div class="mt-4">
+                            <h4 class="font-semibold text-gray-700 mb-2">Position Results</h4>
+                            <div class="space-y-3">
+                                ${data.position_stats.map(position => `
+                                    <div class="border border-gray-200 rounded p-3">
+                                        <h5 class="font-semibold text-gray-800 mb-2">${position.name}</h5>
+                                        <div class="text-sm text-gray-600 mb-2">Total Votes: ${position.total_votes}</div>
+                                        <div class="space-y-1">
+                                            ${position.candidates.map(candidate => `
+                                                <div class="flex justify-between items-center">
+                                                    <span>${candidate.name}</span>
+                                                    <div class="flex items-center space-x-2">
+                                                        <span class="font-semibold">${candidate.votes} votes</span>
+                                                        <span class="text-xs bg-gray-100 px-2 py-1 rounded">${candidate.percentage}%</span>
+                                                    </div>
+                                                </div>
+                                            `).join('')}
+                                        </div>
+                                    </div>
+                                `).join('')}
+                            </div>
+                        </div>
+                    </div>
+                    
+                    <div class="mt-6 flex justify-end">
+                        <button onclick="closeStatsModal()" 
+                                class="px-4 py-2 bg-blue-600 text-white rounded hover:bg-blue-700">
+                            Close
+                        </button>
+                    </div>
+                </div>
+            </div>
+        `;
+        
+        // Add to body
+        const statsModal = document.createElement('div');
+        statsModal.id = 'statsModal';
+        statsModal.innerHTML = statsHtml;
+        document.body.appendChild(statsModal);
+        
+    } catch (error) {
+        alert('Failed to load voting statistics: ' + error.message);
+    }
+}
+
+function closeStatsModal() {
+    const statsModal = document.getElementById('statsModal');
+    if (statsModal) {
+        statsModal.remove();
+    }
+}
+
+// Add a button to view stats (optional - add this near the reset button)
+// You can add this button next to the reset button:
+// <button onclick="showVotingStats()" class="bg-blue-600 text-white px-4 py-2 rounded-md hover:bg-blue-700 transition-colors text-sm">
+//     View Stats
+// </button>
+
+// Migration functionality
+let migrationStudents = [];
+
+// Load sessions for migration target
+async function loadSessionsForMigration() {
+    try {
+        const data = await apiCall('/api/sessions');
+        const select = document.getElementById('targetSessionSelect');
+        
+        select.innerHTML = data.sessions.map(session => 
+            `<option value="${session.id}">${session.name} (${session.academic_year})</option>`
+        ).join('');
+        
+    } catch (error) {
+        updateStatus('Failed to load sessions for migration');
+    }
+}
+
+// Load students for migration
+async function loadStudentsForMigration() {
+    const grade = document.getElementById('migrationGradeSelect').value;
+    
+    try {
+        const data = await apiCall(`/api/migration/students?grade=${encodeURIComponent(grade)}`);
+        migrationStudents = data.students;
+        
+        const studentsList = document.getElementById('migrationStudentsList');
+        studentsList.innerHTML = `
+            <div class="space-y-2 max-h-96 overflow-y-auto">
+                ${migrationStudents.map(student => `
+                    <div class="bg-white border border-gray-200 rounded-lg p-3 flex items-center justify-between">
+                        <div class="flex items-center space-x-3">
+                            <input type="checkbox" id="student-${student.id}" 
+                                   value="${student.id}" 
+                                   class="student-checkbox rounded border-gray-300 text-blue-600 focus:ring-blue-500"
+                                   onchange="updateMigrationStats()"
+                                   ${student.has_voted ? 'disabled' : ''}>
+                            <div>
+                                <div class="font-medium">👤 ${student.name}</div>
+                                <div class="text-sm text-gray-600">
+                                    🎫 ${student.student_id} | 🏫 ${student.grade}
+                                    <span class="ml-2 ${student.has_voted ? 'text-green-600' : 'text-orange-600'}">
+                                        ${student.has_voted ? '✅ Voted' : '⏳ Not Voted'}
+                                    </span>
+                                </div>
+                                <div class="text-sm text-purple-600">🔑 ${student.voter_code}</div>
+                            </div>
+                        </div>
+                        ${student.has_voted ? 
+                            '<span class="text-xs bg-yellow-100 text-yellow-800 px-2 py-1 rounded">Already Voted</span>' : 
+                            ''
+                        }
+                    </div>
+                `).join('')}
+            </div>
+        `;
+        
+        // Update statistics
+        document.getElementById('migrationStats').classList.remove('hidden');
+        updateMigrationStats();
+        
+        updateStatus(`Loaded ${data.total} students from ${grade}`);
+        
+    } catch (error) {
+        updateStatus('Failed to load students: ' + error.message);
+    }
+}
+
+// Update migration statistics
+function updateMigrationStats() {
+    const checkboxes = document.querySelectorAll('.student-checkbox:not(:disabled)');
+    const selected = document.querySelectorAll('.student-checkbox:not(:disabled):checked');
+    const votedCount = migrationStudents.filter(s => s.has_voted).length;
+    
+    document.getElementById('totalStudents').textContent = migrationStudents.length;
+    document.getElementById('selectedStudents').textContent = selected.length;
+    document.getElementById('votedStudents').textContent = votedCount;
+    document.getElementById('notVotedStudents').textContent = migrationStudents.length - votedCount;
+}
+
+// Select all students
+function selectAllStudents() {
+    document.querySelectorAll('.student-checkbox:not(:disabled)').forEach(checkbox => {
+        checkbox.checked = true;
+    });
+    updateMigrationStats();
+}
+
+// Deselect all students
+function deselectAllStudents() {
+    document.querySelectorAll('.student-checkbox').forEach(checkbox => {
+        checkbox.checked = false;
+    });
+    updateMigrationStats();
+}
+
+// Migrate selected students
+async function migrateSelectedStudents() {
+    const selectedStudents = Array.from(document.querySelectorAll('.student-checkbox:checked'))
+        .map(checkbox => checkbox.value);
+    
+    const targetSessionId = document.getElementById('targetSessionSelect').value;
+    
+    if (selectedStudents.length === 0) {
+        alert('Please select at least one student to migrate');
+        return;
+    }
+    
+    if (!targetSessionId) {
+        alert('Please select a target session');
+        return;
+    }
+    
+    if (!confirm(`Are you sure you want to migrate ${selectedStudents.length} students to the selected session? This will reset their voting status.`)) {
+        return;
+    }
+    
+    try {
+        // A whole grade is migrated by filter instead of sending every ID
+        const grade = document.getElementById('migrationGradeSelect').value;
+        const selection = selectedStudents.length === migrationStudents.length
+            ? { grade: grade }
+            : { student_ids: selectedStudents };
+        
+        const data = await apiCall('/api/migration/migrate-students', {
+            method: 'POST',
+            body: JSON.stringify({
+                ...selection,
+                target_session_id: targetSessionId
+            })
+        });
+        
+        updateStatus(data.message);
+        alert(`✅ ${data.message}\n\nMigrated: ${data.migrated_count} students${data.errors.length ? `\nErrors: ${data.errors.join(', ')}` : ''}`);
+        
+        // Reload the students list
+        loadStudentsForMigration();
+        
+    } catch (error) {
+        updateStatus('Migration failed: ' + error.message);
+        alert('Migration failed: ' + error.message);
+    }
+}
+
+// Create year-specific position
+async function createYearPosition() {
+    const targetSessionId = document.getElementById('targetSessionSelect').value;
+    const grade = document.getElementById('migrationGradeSelect').value;
+    
+    if (!targetSessionId) {
+        alert('Please select a target session first');
+        return;
+    }
+    
+    try {
+        const data = await apiCall('/api/migration/create-year-position', {
+            method: 'POST',
+            body: JSON.stringify({
+                session_id: targetSessionId,
+                year: grade
+            })
+        });
+        
+        updateStatus(data.message);
+        alert(`✅ ${data.message}`);
+        
+    } catch (error) {
+        updateStatus('Failed to create position: ' + error.message);
+        alert('Failed to create position: ' + error.message);
+    }
+}
+
+// Update tab click handler to include migration tab
+document.querySelectorAll('.tab-button').forEach(button => {
+    button.addEventListener('click', () => {
+        const tabId = button.getAttribute('data-tab');
+        const tabName = button.textContent.trim();
+        
+        // Check if password is required for this tab
+        if (tabId === 'administration' || tabId === 'voter-registration' || tabId === 'student-migration') {
+            requirePassword(tabId, tabName);
+        } else {
+            // No password required for these tabs
+            document.querySelectorAll('.tab-button').forEach(btn => btn.classList.remove('active'));
+            document.querySelectorAll('.tab-content').forEach(content => content.classList.remove('active'));
+            
+            button.classList.add('active');
+            document.getElementById(tabId).classList.add('active');
+        }
+    });
+});
+
+
+        // Tab functionality
+        document.querySelectorAll('.tab-button').forEach(button => {
+            button.addEventListener('click', () => {
+                // Remove active class from all tabs
+                document.querySelectorAll('.tab-button').forEach(btn => btn.classList.remove('active'));
+                document.querySelectorAll('.tab-content').forEach(content => content.classList.remove('active'));
+                
+                // Add active class to clicked tab
+                button.classList.add('active');
+                const tabId = button.getAttribute('data-tab');
+                document.getElementById(tabId).classList.add('active');
+                
+                // Load tab-specific data
+                if (tabId === 'administration') loadSessions();
+                if (tabId === 'voter-registration') loadVoters();
+                if (tabId === 'election-results') loadSessionsForResults();
+                if (tabId === 'student-migration') loadSessionsForMigration();
+            });
+        });
+
+        // Update datetime
+        function updateDateTime() {
+            const now = new Date();
+            document.getElementById('currentDateTime').textContent = 
+                now.toLocaleString('en-US', { 
+                    year: 'numeric', 
+                    month: '2-digit', 
+                    day: '2-digit',
+                    hour: '2-digit', 
+                    minute: '2-digit', 
+                    second: '2-digit'
+                });
+        }
+        setInterval(updateDateTime, 1000);
+        updateDateTime();
+
+        // Status update function
+        function updateStatus(message) {
+            const timestamp = new Date().toLocaleTimeString();
+            document.getElementById('statusBar').textContent = `${timestamp} - ${message}`;
+            console.log(`Status: ${message}`);
+        }
+
+        // API call function
+        async function apiCall(url, options = {}) {
+            try {
+                const response = await fetch(url, {
+                    headers: {
+                        'Content-Type': 'application/json',
+                        ...options.headers
+                    },
+                    ...options
+                });
+                
+                const data = await response.json();
+                if (!response.ok) {
+                    throw new Error(data.error || 'Request failed');
+                }
+                return data;
+            } catch (error) {
+                updateStatus(`Error: ${error.message}`);
+                throw error;
+            }
+        }
+
+        // Photos are processed in the background; poll until the upload settles, then refresh.
+        // On serverless hosts these polls also finish uploads the background worker never ran.
+        function followPhotoUpload(owner, id, onSettled, attempt = 0) {
+            if (attempt >= 60) return;
+            setTimeout(async () => {
+                try {
+                    const data = await apiCall(`/api/${owner}/${id}/photo`);
+                    if (data.photo_status === 'pending') {
+                        followPhotoUpload(owner, id, onSettled, attempt + 1);
+                    } else {
+                        if (data.photo_status === 'failed') updateStatus('Photo upload failed');
+                        onSettled();
+                    }
+                } catch (error) {
+                    followPhotoUpload(owner, id, onSettled, attempt + 1);
+                }
+            }, 3000);
+        }
+
+        // Load sessions for administration
+        async function loadSessions() {
+            try {
+                const data = await apiCall('/api/sessions');
+                const sessionsList = document.getElementById('sessionsList');
+                
+                sessionsList.innerHTML = data.sessions.map(session => `
+                    <div class="bg-white border border-gray-200 rounded-lg p-4 flex justify-between items-center">
+                        <div>
+                            <span class="font-medium">📁 ${session.name} (${session.academic_year})</span>
+                            <span class="ml-2 px-2 py-1 text-xs rounded ${session.is_active ? 'bg-green-100 text-green-800' : 'bg-gray-100 text-gray-800'}">
+                                ${session.is_active ? '✅ ACTIVE' : '⏸️ Inactive'}
+                            </span>
+                        </div>
+                        <div class="space-x-2">
+                            ${!session.is_active ? `
+                                <button onclick="activateSession(${session.id})" class="bg-blue-600 text-white px-3 py-1 text-sm rounded hover:bg-blue-700">
+                                    Activate
+                                </button>
+                            ` : ''}
+                            <button onclick="deleteSession(${session.id})" class="bg-red-600 text-white px-3 py-1 text-sm rounded hover:bg-red-700">
+                                Delete
+                            </button>
+                        </div>
+                    </div>
+                `).join('');
+                
+                // Load position and candidate management if active session exists
+                const activeSession = data.sessions.find(s => s.is_active);
+                if (activeSession) {
+                    loadPositionManagement(activeSession.id);
+                    loadCandidateManagement(activeSession.id);
+                }
+                
+            } catch (error) {
+                updateStatus('Failed to load sessions');
+            }
+        }
+
+        // Activate session
+        async function activateSession(sessionId) {
+            try {
+                await apiCall(`/api/sessions/${sessionId}/activate`, { method: 'POST' });
+                updateStatus('Session activated successfully');
+                loadSessions();
+                location.reload(); // Reload to update active session display
+            } catch (error) {
+                updateStatus('Failed to activate session');
+            }
+        }
+
+        // Delete session
+        async function deleteSession(sessionId) {
+            if (!confirm('Are you sure you want to delete this session? This will also delete all positions, candidates, and voting data.')) {
+                return;
+            }
+            
+            try {
+                await apiCall(`/api/sessions/${sessionId}`, { method: 'DELETE' });
+                updateStatus('Session deleted successfully');
+                loadSessions();
+            } catch (error) {
+                updateStatus('Failed to delete session');
+            }
+        }
+
+        // Load position management
+        async function loadPositionManagement(sessionId) {
+            try {
+                const data = await apiCall(`/api/sessions/${sessionId}/positions`);
+                const positionManagement = document.getElementById('positionManagement');
+                
+                positionManagement.innerHTML = `
+                    <form id="newPositionForm" class="bg-white border border-gray-200 rounded-lg p-4 mb-4">
+                        <h4 class="font-medium text-gray-700 mb-3">➕ Add New Position</h4>
+                        <div class="space-y-3">
+                            <div>
+                                <label class="block text-sm font-medium text-gray-700 mb-1">Position Name</label>
+                                <input type="text" name="name" placeholder="e.g., School President" required
+                                       class="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500">
+                            </div>
+                            <div>
+                                <label class="block text-sm font-medium text-gray-700 mb-1">Voting Type</label>
+                                <select name="voting_type" class="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500">
+                                    <option value="single">Single Vote (Choose 1 candidate)</option>
+                                    <option value="double">Double Vote (Choose 2 candidates)</option>
+                                </select>
+                            </div>
+                            <div>
+                                <label class="block text-sm font-medium text-gray-700 mb-1">Display Order</label>
+                                <input type="number" name="display_order" placeholder="1, 2, 3..." 
+                                       class="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500">
+                            </div>
+                            <div>
+                                <label class="block text-sm font-medium text-gray-700 mb-1">Description</label>
+                                <textarea name="description" rows="2" placeholder="Position description..."
+                                          class="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500"></textarea>
+                            </div>
+                            <input type="hidden" name="session_id" value="${sessionId}">
+                            <button type="submit" class="w-full bg-blue-600 text-white py-2 px-4 rounded-md hover:bg-blue-700">
+                                🚀 Add Position
+                            </button>
+                        </div>
+                    </form>
+                    <div id="positionsList" class="space-y-2">
+                        ${data.positions.map(position => `
+                            <div class="bg-gray-50 border border-gray-200 rounded-lg p-3 flex justify-between items-center">
+                                <div>
+                                    <span class="font-medium">🔢 ${position.display_order}. 🎭 ${position.name}</span>
+                                    ${position.description ? `<span class="text-gray-600 ml-2">- ${position.description}</span>` : ''}
+                                    <span class="ml-2 text-sm text-gray-500">👥 ${position.candidate_count} candidates</span>
+                                </div>
+                                <button onclick="deletePosition(${position.id})" class="bg-red-600 text-white px-2 py-1 text-sm rounded hover:bg-red-700">
+                                    Delete
+                                </button>
+                            </div>
+                        `).join('')}
+                    </div>
+                `;
+                
+                // Add form submit handler
+                document.getElementById('newPositionForm').addEventListener('submit', async (e) => {
+                    e.preventDefault();
+                    const formData = new FormData(e.target);
+                    const data = Object.fromEntries(formData);
+                    
+                    try {
+                        await apiCall('/api/positions', {
+                            method: 'POST',
+                            body: JSON.stringify(data)
+                        });
+                        updateStatus('Position added successfully');
+                        loadPositionManagement(sessionId);
+                        loadCandidateManagement(sessionId);
+                        e.target.reset();
+                    } catch (error) {
+                        updateStatus('Failed to add position');
+                    }
+                });
+                
+            } catch (error) {
+                updateStatus('Failed to load positions');
+            }
+        }
+
+        // Delete position
+        async function deletePosition(positionId) {
+            if (!confirm('Are you sure you want to delete this position? This will also delete all candidates for this position.')) {
+                return;
+            }
+            
+            try {
+                await apiCall(`/api/positions/${positionId}`, { method: 'DELETE' });
+                updateStatus('Position deleted successfully');
+                loadSessions(); // Reload to refresh the management interface
+            } catch (error) {
+                updateStatus('Failed to delete position');
+            }
+        }
+
+        // Load candidate management
+        async function loadCandidateManagement(sessionId) {
+            try {
+                const positionsData = await apiCall(`/api/sessions/${sessionId}/positions`);
+                const candidateManagement = document.getElementById('candidateManagement');
+                
+                if (positionsData.positions.length === 0) {
+                    candidateManagement.innerHTML = '<p class="text-gray-500 text-center py-4">No positions available. Please add positions first.</p>';
+                    return;
+                }
+                
+                candidateManagement.innerHTML = `
+                    <form id="newCandidateForm" class="bg-white border border-gray-200 rounded-lg p-4 mb-4" enctype="multipart/form-data">
+                        <h4 class="font-medium text-gray-700 mb-3">➕ Add New Candidate</h4>
+                        <div class="space-y-3">
+                            <div>
+                                <label class="block text-sm font-medium text-gray-700 mb-1">Select Position</label>
+                                <select name="position_id" required class="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500">
+                                    ${positionsData.positions.map(pos => `<option value="${pos.id}">${pos.name}</option>`).join('')}
+                                </select>
+                            </div>
+                            <div>
+                                <label class="block text-sm font-medium text-gray-700 mb-1">Candidate Name</label>
+                                <input type="text" name="name" placeholder="e.g., John Smith" required
+                                       class="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500">
+                            </div>
+                            <div>
+                                <label class="block text-sm font-medium text-gray-700 mb-1">Grade/Class</label>
+                                <input type="text" name="grade" placeholder="e.g., Grade 10A"
+                                       class="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500">
+                            </div>
+                            <div>
+                                <label class="block text-sm font-medium text-gray-700 mb-1">Manifesto/Platform</label>
+                                <textarea name="manifesto" rows="3" placeholder="Candidate manifesto..."
+                                          class="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500"></textarea>
+                            </div>
+                            <div>
+                                <label class="block text-sm font-medium text-gray-700 mb-1">Candidate Photo</label>
+                                <input type="file" name="photo" accept="image/*"
+                                       class="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500">
+                            </div>
+                            <button type="submit" class="w-full bg-blue-600 text-white py-2 px-4 rounded-md hover:bg-blue-700">
+                                🚀 Add Candidate
+                            </button>
+                        </div>
+                    </form>
+                    <div id="candidatesList" class="space-y-3">
+                        <!-- Candidates will be loaded per position -->
+                    </div>
+                `;
+                
+                // Load candidates for each position
+                loadAllCandidates(sessionId);
+                
+                // Add form submit handler
+                document.getElementById('newCandidateForm').addEventListener('submit', async (e) => {
+                    e.preventDefault();
+                    const formData = new FormData(e.target);
+                    
+                    try {
+                        const response = await fetch('/api/candidates', {
+                            method: 'POST',
+                            body: formData
+                        });
+                        
+                        const data = await response.json();
+                        if (!response.ok) {
+                            throw new Error(data.error || 'Request failed');
+                        }
+                        
+                        updateStatus('Candidate added successfully');
+                        loadAllCandidates(sessionId);
+                        e.target.reset();
+                        if (data.candidate.photo_status === 'pending') {
+                            followPhotoUpload('candidates', data.candidate.id, () => loadAllCandidates(sessionId));
+                        }
+                    } catch (error) {
+                        updateStatus('Failed to add candidate: ' + error.message);
+                    }
+                });
+                
+            } catch (error) {
+                updateStatus('Failed to load candidate management');
+            }
+        }
+
+        // Load all candidates
+        async function loadAllCandidates(sessionId) {
+            try {
+                const positionsData = await apiCall(`/api/sessions/${sessionId}/positions`);
+                const candidatesList = document.getElementById('candidatesList');
+                
+                let allCandidatesHTML = '';
+                
+                for (const position of positionsData.positions) {
+                    const candidatesData = await apiCall(`/api/positions/${position.id}/candidates`);
+                    
+                    allCandidatesHTML += `
+                        <div class="bg-gray-50 border border-gray-200 rounded-lg p-3">
+                            <div class="font-medium text-gray-700 mb-2">🎭 ${position.name}</div>
+                            ${candidatesData.candidates.length > 0 ? 
+                                candidatesData.candidates.map(candidate => `
+                                    <div class="bg-white border border-gray-200 rounded p-2 mb-2 flex justify-between items-center">
+                                        <div class="flex items-center space-x-3">
+                                            ${candidate.photo_url ? 
+                                                photoHtml(candidate, 'w-16 h-16 rounded-full object-cover', candidate.name) : 
+                                                `<div class="w-16 h-16 bg-gray-200 rounded-full flex items-center justify-center text-xl">👤</div>`
+                                            }
+                                            <div>
+                                                <div class="font-medium">👤 ${candidate.name} ${candidate.grade ? `| 🏫 ${candidate.grade}` : ''}</div>
+                                                ${candidate.manifesto ? `<div class="text-sm text-gray-600 truncate max-w-xs">${candidate.manifesto}</div>` : ''}
+                                                <div class="text-sm text-green-600">🗳️ Votes: ${candidate.votes}</div>
+                                            </div>
+                                        </div>
+                                        <button onclick="deleteCandidate(${candidate.id})" class="bg-red-600 text-white px-2 py-1 text-sm rounded hover:bg-red-700">
+                                            Delete
+                                        </button>
+                                    </div>
+                                `).join('') :
+                                '<p class="text-gray-500 text-center py-2">No candidates for this position</p>'
+                            }
+                        </div>
+                    `;
+                }
+                
+                candidatesList.innerHTML = allCandidatesHTML;
+                
+            } catch (error) {
+                updateStatus('Failed to load candidates');
+            }
+        }
+
+        // Delete candidate
+        async function deleteCandidate(candidateId) {
+            if (!confirm('Are you sure you want to delete this candidate?')) {
+                return;
+            }
+            
+            try {
+                await apiCall(`/api/candidates/${candidateId}`, { method: 'DELETE' });
+                updateStatus('Candidate deleted successfully');
+                loadSessions(); // Reload to refresh the management interface
+            } catch (error) {
+                updateStatus('Failed to delete candidate');
+            }
+        }
+
+        // Fetch every page of /api/voters, for exports and pickers that need the whole roster
+        async function fetchAllVoters(filters = {}) {
+            let voters = [];
+            let cursor = null;
+            do {
+                const params = new URLSearchParams({ ...filters, limit: 1000 });
+                if (cursor) params.set('cursor', cursor);
+                const data = await apiCall(`/api/voters?${params}`);
+                voters = voters.concat(data.voters);
+                cursor = data.next_cursor;
+            } while (cursor);
+            return voters;
+        }
+
+        // Load voter statistics cards
+        async function loadVoterStats() {
+            try {
+                const stats = await apiCall('/api/voters/stats');
+                document.getElementById('voterStatsTotal').textContent = stats.total;
+                document.getElementById('voterStatsVoted').textContent = stats.voted;
+                document.getElementById('voterStatsNotVoted').textContent = stats.not_voted;
+                document.getElementById('voterStatsParticipation').textContent = `${stats.participation_rate}%`;
+            } catch (error) {
+                console.error('Failed to load voter statistics:', error);
+            }
+        }
+
+        // Load voters, one page at a time
+        let votersCursor = null;
+
+        async function loadVoters(append = false) {
+            try {
+                const params = new URLSearchParams({ limit: 50 });
+                const searchTerm = document.getElementById('voterSearch').value.trim();
+                if (searchTerm) {
+                    params.set(searchTerm.toUpperCase().startsWith('AA-') ? 'student_id' : 'name', searchTerm);
+                }
+                if (append && votersCursor) params.set('cursor', votersCursor);
+                if (!append) loadVoterStats();
+                
+                const data = await apiCall(`/api/voters?${params}`);
+                const votersList = document.getElementById('votersList');
+                votersCursor = data.next_cursor;
+                document.getElementById('loadMoreVoters').classList.toggle('hidden', !votersCursor);
+                
+                const votersHtml = data.voters.map(voter => `
+                    <div>
+                        <div class="bg-white border border-gray-200 rounded-lg p-4 flex justify-between items-center">
+                            <div class="flex items-center space-x-4">
+                                ${voter.photo_url ? 
+                                    photoHtml(voter, 'w-12 h-12 rounded-full object-cover', voter.name) : 
+                                    `<div class="w-12 h-12 bg-gray-200 rounded-full flex items-center justify-center">👤</div>`
+                                }
+                                <div>
+                                    <div class="font-medium">👤 ${voter.name}</div>
+                                    <div class="text-sm text-blue-600">🎫 ${voter.student_id}</div>
+                                    <div class="text-sm text-gray-600">🏫 ${voter.grade}</div>
+                                    <div class="text-sm text-gray-500">📅 Registered: ${voter.registered_date}</div>
+                                    <div class="text-sm font-medium ${voter.has_voted ? 'text-green-600' : 'text-orange-600'}">
+                                        ${voter.has_voted ? '✅ Voted' : '⏳ Not Voted'}
+                                    </div>
+                                    <div class="text-sm text-purple-600">🔑 Code: ${voter.voter_code}</div>
+                                </div>
+                            </div>
+                            <button onclick="deleteVoter(${voter.id})" class="bg-red-600 text-white px-3 py-1 text-sm rounded hover:bg-red-700">
+                                Delete
+                            </button>
+                        </div>
+                    </div>
+                `).join('');
+                
+                if (append) {
+                    votersList.insertAdjacentHTML('beforeend', votersHtml);
+                } else {
+                    votersList.innerHTML = votersHtml;
+                }
+                
+            } catch (error) {
+                updateStatus('Failed to load voters');
+            }
+        }
+
+        // Delete voter
+        async function deleteVoter(voterId) {
+            if (!confirm('Are you sure you want to delete this voter?')) {
+                return;
+            }
+            
+            try {
+                await apiCall(`/api/voters/${voterId}`, { method: 'DELETE' });
+                updateStatus('Voter deleted successfully');
+                loadVoters();
+            } catch (error) {
+                updateStatus('Failed to delete voter');
+            }
+        }
+
+        // Voter registration form
+        document.getElementById('voterRegistrationForm').addEventListener('submit', async (e) => {
+            e.preventDefault();
+            const formData = new FormData(e.target);
+            
+            try {
+                const response = await fetch('/api/voters', {
+                    method: 'POST',
+                    body: formData
+                });
+                
+                const data = await response.json();
+                if (!response.ok) {
+                    throw new Error(data.error || 'Request failed');
+                }
+                
+                updateStatus(`Voter "${data.voter.name}" registered successfully with ID: ${data.voter.student_id} and Code: ${data.voter.voter_code}`);
+                alert(`✅ Voter Registered Successfully!\n\n👤 Name: ${data.voter.name}\n🎫 Student ID: ${data.voter.student_id}\n🏫 Grade: ${data.voter.grade}\n🔑 Voter Code: ${data.voter.voter_code}\n\nPlease give the voter code to the student for voting.`);
+                e.target.reset();
+                loadVoters();
+                if (data.voter.photo_status === 'pending') {
+                    followPhotoUpload('voters', data.voter.id, () => loadVoters());
+                }
+            } catch (error) {
+                updateStatus('Failed to register voter: ' + error.message);
+            }
+        });
+
+        // Voter search - filtered on the server by name or student ID prefix
+        let voterSearchTimer = null;
+        document.getElementById('voterSearch').addEventListener('input', function() {
+            clearTimeout(voterSearchTimer);
+            voterSearchTimer = setTimeout(() => loadVoters(), 300);
+        });
+
+        // Voting functions
+        let currentPositionIndex = 0;
+        let votingPositions = [];
+        let ballotSelections = [];
+
+        async function verifyVoter() {
+            const voterCode = document.getElementById('voterCodeInput').value.trim();
+            
+            if (!voterCode) {
+                alert('Please enter your voter code');
+                return;
+            }
+            
+            try {
+                const data = await apiCall('/api/voting/verify', {
+                    method: 'POST',
+                    body: JSON.stringify({ voter_code: voterCode })
+                });
+                
+                updateStatus(`Voter verified: ${data.voter.name}`);
+                document.getElementById('welcomeScreen').classList.add('hidden');
+                document.getElementById('votingScreen').classList.remove('hidden');
+                
+                // Load voting positions
+                await loadVotingPositions();
+                
+            } catch (error) {
+                alert('Verification Not confirmed: ' + error.message);
+            }
+        }
+
+        async function loadVotingPositions() {
+            try {
+                const data = await apiCall('/api/voting/positions');
+                votingPositions = data.positions;
+                currentPositionIndex = 0;
+                ballotSelections = [];
+                showCurrentPosition();
+            } catch (error) {
+                updateStatus('Failed to load voting positions');
+            }
+        }
+
+        function showCurrentPosition() {
+            if (currentPositionIndex >= votingPositions.length) {
+                completeVoting();
+                return;
+            }
+            
+            const position = votingPositions[currentPositionIndex];
+            const votingScreen = document.getElementById('votingScreen');
+            const isDoubleVoting = position.voting_type === 'double';
+            
+            votingScreen.innerHTML = `
+                <div class="bg-white rounded-lg shadow-sm border">
+                    <!-- Position Header -->
+                    <div class="bg-blue-50 border-b p-6">
+                        <h2 class="text-xl font-bold text-blue-800">🎭 CURRENT POSITION: ${position.name}</h2>
+                        ${position.description ? `<p class="text-blue-700 mt-2">${position.description}</p>` : ''}
+                        ${isDoubleVoting ? 
+                            '<p class="text-green-700 font-bold mt-2">📝 Please select TWO candidates (1st and 2nd choice)</p>' : 
+                            '<p class="text-blue-700 mt-2">📝 Please select ONE candidate</p>'
+                        }
+                    </div>
+                    
+                    <!-- Progress -->
+                    <div class="bg-gray-50 border-b p-4">
+                        <div class="flex justify-between items-center">
+                            <p class="text-gray-700 font-medium">
+                                📊 PROGRESS: POSITION ${currentPositionIndex + 1} OF ${votingPositions.length}
+                            </p>
+                            <div class="w-1/2 bg-gray-200 rounded-full h-2">
+                                <div class="bg-blue-600 h-2 rounded-full" style="width: ${((currentPositionIndex + 1) / votingPositions.length) * 100}%"></div>
+                            </div>
+                        </div>
+                    </div>
+                    
+                    <!-- Candidates -->
+                    <div class="p-6">
+                        ${isDoubleVoting ? renderDoubleVotingInterface(position) : renderSingleVotingInterface(position)}
+                    </div>
+                </div>
+            `;
+            
+            // Initialize double voting selection tracking
+            if (isDoubleVoting) {
+                selectedFirstChoice = null;
+                selectedSecondChoice = null;
+                updateDoubleVoteSelection();
+            }
+        }
+
+        function renderDoubleVotingInterface(position) {
+            return `
+                <h3 class="text-lg font-semibold text-gray-800 mb-4">👥 SELECT TWO CANDIDATES (1st and 2nd choice)</h3>
+                <form id="doubleVoteForm">
+                    <div class="space-y-4" id="candidatesContainer">
+                        ${position.candidates.map((candidate, index) => `
+                            <div class="candidate-card bg-white border border-gray-200 rounded-lg p-6 hover:shadow-md transition-shadow">
+                                <div class="flex items-start space-x-4">
+                                    <!-- Checkbox Selection -->
+                                    <div class="flex items-center space-x-4">
+                                        <div class="flex flex-col space-y-3">
+                                            <div class="flex items-center">
+                                                <input type="radio" 
+                                                    name="first_choice" 
+                                                    value="${candidate.id}" 
+                                                    id="first_${candidate.id}"
+                                                    class="mr-2 h-4 w-4 text-green-600 focus:ring-green-500 border-gray-300"
+                                                    onchange="updateDoubleVoteSelection()">
+                                                <label for="first_${candidate.id}" class="text-sm font-medium text-green-700 flex items-center">
+                                                    <span class="mr-1">🏆</span> 1st Choice
+                                                </label>
+                                            </div>
+                                            <div class="flex items-center">
+                                                <input type="radio" 
+                                                    name="second_choice" 
+                                                    value="${candidate.id}" 
+                                                    id="second_${candidate.id}"
+                                                    class="mr-2 h-4 w-4 text-blue-600 focus:ring-blue-500 border-gray-300"
+                                                    onchange="updateDoubleVoteSelection()">
+                                                <label for="second_${candidate.id}" class="text-sm font-medium text-blue-700 flex items-center">
+                                                    <span class="mr-1">🥈</span> 2nd Choice
+                                                </label>
+                                            </div>
+                                        </div>
+                                    </div>
+                                    
+                                    <!-- Candidate Info -->
+                                    <div class="flex-1">
+                                        <div class="flex items-start space-x-4">
+                                            ${candidate.photo_url ? 
+                                                photoHtml(candidate, 'w-16 h-16 rounded-lg object-cover', candidate.name) : 
+                                                `<div class="w-16 h-16 bg-gray-200 rounded-lg flex items-center justify-center text-2xl">👤</div>`
+                                            }
+                                            <div class="flex-1">
+                                                <h4 class="text-lg font-semibold text-gray-800">
+                                                    👤 ${candidate.name} ${candidate.grade ? `| 🏫 ${candidate.grade}` : ''}
+                                                </h4>
+                                                ${candidate.manifesto ? `
+                                                    <div class="bg-gray-50 rounded p-3 mt-2">
+                                                        <p class="text-gray-600 text-sm">${candidate.manifesto}</p>
+                                                    </div>
+                                                ` : ''}
+                                            </div>
+                                        </div>
+                                    </div>
+                                </div>
+                            </div>
+                        `).join('')}
+                    </div>
+                    
+                    <!-- Selected Choices Display -->
+                    <div id="selectedChoices" class="mt-6 bg-green-50 border border-green-200 rounded-lg p-4">
+                        <h4 class="font-semibold text-green-800 mb-2">✅ Your Selections:</h4>
+                        <div class="grid grid-cols-1 md:grid-cols-2 gap-4">
+                            <div id="firstChoiceDisplay" class="bg-white border border-green-300 rounded p-3">
+                                <span class="text-green-700 font-medium flex items-center">
+                                    <span class="mr-2">🏆</span> 1st Choice:
+                                </span>
+                                <span class="ml-2 text-gray-700">Not selected</span>
+                            </div>
+                            <div id="secondChoiceDisplay" class="bg-white border border-blue-300 rounded p-3">
+                                <span class="text-blue-700 font-medium flex items-center">
+                                    <span class="mr-2">🥈</span> 2nd Choice:
+                                </span>
+                                <span class="ml-2 text-gray-700">Not selected</span>
+                            </div>
+                        </div>
+                    </div>
+                    
+                    <!-- Vote Button -->
+                    <div class="mt-6 text-center">
+                        <button type="button" 
+                                onclick="castDoubleVote(${position.id})" 
+                                id="doubleVoteBtn"
+                                disabled
+                                class="bg-gray-400 text-white px-8 py-4 rounded-lg font-semibold text-lg cursor-not-allowed w-full">
+                            ✅ SUBMIT TWO VOTES
+                        </button>
+                        <p class="text-sm text-gray-600 mt-2">Please select both 1st and 2nd choice candidates</p>
+                    </div>
+                </form>
+                
+                <!-- Skip Button -->
+                <div class="mt-6 text-center">
+                    <button onclick="skipPosition()" class="bg-gray-600 text-white px-6 py-3 rounded-lg hover:bg-gray-700 transition-colors w-48">
+                        ⏭️ SKIP POSITION
+                    </button>
+                </div>
+            `;
+        }
+
+        function renderSingleVotingInterface(position) {
+            return `
+                <h3 class="text-lg font-semibold text-gray-800 mb-4">👥 SELECT YOUR CANDIDATE</h3>
+                ${position.candidates.length > 0 ? `
+                    <div class="space-y-4">
+                        ${position.candidates.map(candidate => `
+                            <div class="candidate-card bg-white border border-gray-200 rounded-lg p-6 hover:shadow-md transition-shadow">
+                                <div class="flex flex-col lg:flex-row lg:items-center lg:justify-between">
+                                    <!-- Candidate Info -->
+                                    <div class="flex-1">
+                                        <div class="flex items-start space-x-4">
+                                            ${candidate.photo_url ? 
+                                                photoHtml(candidate, 'w-16 h-16 rounded-lg object-cover', candidate.name) : 
+                                                `<div class="w-16 h-16 bg-gray-200 rounded-lg flex items-center justify-center text-2xl">👤</div>`
+                                            }
+                                            <div class="flex-1">
+                                                <h4 class="text-lg font-semibold text-gray-800">
+                                                    👤 ${candidate.name} ${candidate.grade ? `| 🏫 ${candidate.grade}` : ''}
+                                                </h4>
+                                                ${candidate.manifesto ? `
+                                                    <div class="bg-gray-50 rounded p-3 mt-2">
+                                                        <p class="text-gray-600 text-sm">${candidate.manifesto}</p>
+                                                    </div>
+                                                ` : ''}
+                                            </div>
+                                        </div>
+                                    </div>
+                                    
+                                    <!-- Vote Button -->
+                                    <div class="mt-4 lg:mt-0 lg:ml-4">
+                                        <button onclick="castVote(${position.id}, ${candidate.id})" 
+                                                class="bg-green-600 text-white px-6 py-3 rounded-lg hover:bg-green-700 transition-colors font-semibold w-48">
+                                            ✅ VOTE FOR THIS CANDIDATE
+                                        </button>
+                                    </div>
+                                </div>
+                            </div>
+                        `).join('')}
+                    </div>
+                    
+                    <!-- Skip Button -->
+                    <div class="mt-6 text-center">
+                        <button onclick="skipPosition()" class="bg-gray-600 text-white px-6 py-3 rounded-lg hover:bg-gray-700 transition-colors w-48">
+                            ⏭️ SKIP POSITION
+                        </button>
+                    </div>
+                ` : `
+                    <div class="bg-yellow-50 border border-yellow-200 rounded-lg p-6 text-center">
+                        <p class="text-yellow-700 text-lg">ℹ️ NO CANDIDATES AVAILABLE FOR THIS POSITION</p>
+                        <button onclick="skipPosition()" class="bg-gray-600 text-white px-6 py-2 rounded-lg hover:bg-gray-700 transition-colors mt-4">
+                            ⏭️ SKIP POSITION
+                        </button>
+                    </div>
+                `}
+            `;
+        }
+
+        // Add these new JavaScript functions
+        let selectedFirstChoice = null;
+        let selectedSecondChoice = null;
+
+        function updateDoubleVoteSelection() {
+            const form = document.getElementById('doubleVoteForm');
+            if (!form) return;
+            
+            const firstChoice = form.first_choice.value;
+            const secondChoice = form.second_choice.value;
+            
+            selectedFirstChoice = firstChoice;
+            selectedSecondChoice = secondChoice;
+            
+            // Update display
+            const firstChoiceDisplay = document.getElementById('firstChoiceDisplay');
+            const secondChoiceDisplay = document.getElementById('secondChoiceDisplay');
+            const selectedChoicesDiv = document.getElementById('selectedChoices');
+            const voteBtn = document.getElementById('doubleVoteBtn');
+            
+            if (firstChoice) {
+                const candidateName = getCandidateName(firstChoice);
+                firstChoiceDisplay.innerHTML = `<span class="text-green-700 font-medium">1st Choice:</span> <span class="ml-2 font-semibold">${candidateName}</span>`;
+            } else {
+                firstChoiceDisplay.innerHTML = '<span class="text-green-700 font-medium">1st Choice:</span> <span class="ml-2 text-gray-700">Not selected</span>';
+            }
+            
+            if (secondChoice) {
+                const candidateName = getCandidateName(secondChoice);
+                secondChoiceDisplay.innerHTML = `<span class="text-blue-700 font-medium">2nd Choice:</span> <span class="ml-2 font-semibold">${candidateName}</span>`;
+            } else {
+                secondChoiceDisplay.innerHTML = '<span class="text-blue-700 font-medium">2nd Choice:</span> <span class="ml-2 text-gray-700">Not selected</span>';
+            }
+            
+            // Show/hide selections display
+            if (firstChoice || secondChoice) {
+                selectedChoicesDiv.classList.remove('hidden');
+            } else {
+                selectedChoicesDiv.classList.add('hidden');
+            }
+            
+            // Enable/disable vote button
+            if (firstChoice && secondChoice && firstChoice !== secondChoice) {
+                voteBtn.disabled = false;
+                voteBtn.classList.remove('bg-gray-400', 'cursor-not-allowed');
+                voteBtn.classList.add('bg-green-600', 'hover:bg-green-700', 'cursor-pointer');
+            } else {
+                voteBtn.disabled = true;
+                voteBtn.classList.add('bg-gray-400', 'cursor-not-allowed');
+                voteBtn.classList.remove('bg-green-600', 'hover:bg-green-700', 'cursor-pointer');
+            }
+        }
+
+        function getCandidateName(candidateId) {
+            const position = votingPositions[currentPositionIndex];
+            const candidate = position.candidates.find(c => c.id == candidateId);
+            return candidate ? candidate.name : 'Unknown';
+        }
+
+        async function castDoubleVote(positionId) {
+            if (!selectedFirstChoice || !selectedSecondChoice || selectedFirstChoice === selectedSecondChoice) {
+                alert('Please select two different candidates');
+                return;
+            }
+            
+            // Selections are submitted together with the rest of the ballot
+            ballotSelections.push({
+                position_id: positionId,
+                first_choice_id: selectedFirstChoice,
+                second_choice_id: selectedSecondChoice
+            });
+            
+            updateStatus('Two choices recorded');
+            selectedFirstChoice = null;
+            selectedSecondChoice = null;
+            currentPositionIndex++;
+            showCurrentPosition();
+        }
+
+        async function castVote(positionId, candidateId) {
+            // Selections are submitted together with the rest of the ballot
+            ballotSelections.push({
+                position_id: positionId,
+                candidate_id: candidateId
+            });
+            
+            updateStatus('Choice recorded');
+            currentPositionIndex++;
+            showCurrentPosition();
+        }
+
+        function skipPosition() {
+            currentPositionIndex++;
+            showCurrentPosition();
+        }
+
+        async function completeVoting() {
+            try {
+                await apiCall('/api/voting/ballot', {
+                    method: 'POST',
+                    body: JSON.stringify({ selections: ballotSelections })
+                });
+                ballotSelections = [];
+                document.getElementById('votingScreen').classList.add('hidden');
+                document.getElementById('votingCompleteScreen').classList.remove('hidden');
+                updateStatus('Voting completed successfully');
+            } catch (error) {
+                alert('Failed to submit ballot: ' + error.message);
+                updateStatus('Failed to complete voting');
+            }
+        }
+
+        function resetVoting() {
+            document.getElementById('votingCompleteScreen').classList.add('hidden');
+            document.getElementById('welcomeScreen').classList.remove('hidden');
+            document.getElementById('voterCodeInput').value = '';
+        }
+
+        // Results functions
+        async function loadSessionsForResults() {
+            try {
+                const data = await apiCall('/api/sessions');
+                const select = document.getElementById('resultsSessionSelect');
+                
+                select.innerHTML = data.sessions.map(session => 
+                    `<option value="${session.id}">${session.name} (${session.academic_year})</option>`
+                ).join('');
+                
+            } catch (error) {
+                updateStatus('Failed to load sessions for results');
+            }
+        }
+
+        async function loadResults() {
+            const sessionId = document.getElementById('resultsSessionSelect').value;
+            if (!sessionId) {
+                alert('Please select a session first');
+                return;
+            }
+            
+            try {
+                const data = await apiCall(`/api/results/${sessionId}`);
+                const resultsDisplay = document.getElementById('resultsDisplay');
+                
+                resultsDisplay.innerHTML = `
+                    <!-- Session Header -->
+                    <div class="bg-white border border-gray-200 rounded-lg p-6 mb-6">
+                        <div class="bg-blue-50 border border-blue-200 rounded-lg p-4 mb-4">
+                            <h2 class="text-xl font-bold text-blue-800">📁 ELECTION SESSION: ${data.session.name}</h2>
+                            <p class="text-blue-700">📅 ACADEMIC YEAR: ${data.session.academic_year}</p>
+                        </div>
+                        
+                        <!-- Statistics -->
+                        <div class="bg-gray-50 rounded-lg p-4">
+                            <div class="grid grid-cols-2 lg:grid-cols-4 gap-4">
+                                <div class="bg-white border border-gray-200 rounded-lg p-4 text-center">
+                                    <div class="text-2xl font-bold text-blue-600">${data.statistics.total_positions}</div>
+                                    <div class="text-sm text-gray-600">Total Positions</div>
+                                </div>
+                                <div class="bg-white border border-gray-200 rounded-lg p-4 text-center">
+                                    <div class="text-2xl font-bold text-blue-600">${data.statistics.total_candidates}</div>
+                                    <div class="text-sm text-gray-600">Total Candidates</div>
+                                </div>
+                                <div class="bg-white border border-gray-200 rounded-lg p-4 text-center">
+                                    <div class="text-2xl font-bold text-blue-600">${data.statistics.total_votes}</div>
+                                    <div class="text-sm text-gray-600">Total Votes Cast</div>
+                                </div>
+                                <div class="bg-white border border-gray-200 rounded-lg p-4 text-center">
+                                    <div class="text-2xl font-bold text-blue-600">${data.statistics.average_votes_per_position}</div>
+                                    <div class="text-sm text-gray-600">Avg Votes per Position</div>
+                                </div>
+                            </div>
+                        </div>
+                    </div>
+                    
+                    <!-- Positions Results -->
+                    <div class="space-y-6">
+                        ${data.positions.map(position => `
+                            <div class="bg-white border border-gray-200 rounded-lg">
+                                <!-- Position Header -->
+                                <div class="bg-blue-50 border-b p-4">
+                                    <h3 class="text-lg font-bold text-blue-800">
+                                        🎭 POSITION: ${position.name}${position.description ? ` - ${position.description}` : ''}
+                                    </h3>
+                                </div>
+                                
+                                <!-- Candidates Results -->
+                                <div class="p-4">
+                                    ${position.candidates.length > 0 ? `
+                                        <div class="space-y-4">
+                                            ${position.candidates.map(candidate => `
+                                                <div class="border border-gray-200 rounded-lg p-4 ${candidate.is_winner ? 'bg-green-50 border-green-200' : 'bg-gray-50'}">
+                                                    <div class="flex flex-col lg:flex-row lg:items-center lg:justify-between">
+                                                        <!-- Candidate Info -->
+                                                        <div class="flex-1">
+                                                            <div class="flex items-start space-x-4">
+                                                                ${candidate.photo_url ? 
+                                                                    photoHtml(candidate, 'w-12 h-12 rounded-lg object-cover', candidate.name) : 
+                                                                    `<div class="w-12 h-12 bg-gray-200 rounded-lg flex items-center justify-center">📷</div>`
+                                                                }
+                                                                <div class="flex-1">
+                                                                    <div class="flex items-center space-x-2 mb-1">
+                                                                        <span class="font-semibold ${candidate.is_winner ? 'text-green-700' : 'text-gray-800'}">
+                                                                            #${candidate.rank} ${candidate.is_winner ? '🏆 WINNER' : ''}
+                                                                        </span>
+                                                                        <span class="text-lg font-semibold text-gray-800">
+                                                                            👤 ${candidate.name} ${candidate.grade ? `| 🏫 ${candidate.grade}` : ''}
+                                                                        </span>
+                                                                    </div>
+                                                                    ${candidate.manifesto ? `
+                                                                        <div class="bg-white rounded p-2 mt-1">
+                                                                            <p class="text-gray-600 text-sm">${candidate.manifesto}</p>
+                                                                        </div>
+                                                                    ` : ''}
+                                                                </div>
+                                                            </div>
+                                                        </div>
+                                                        
+                                                        <!-- Votes -->
+                                                        <div class="mt-3 lg:mt-0 lg:ml-4 text-right">
+                                                            <div class="text-xl font-bold text-green-600">
+                                                                🗳️ ${candidate.votes} VOTES (${candidate.percentage}%)
+                                                            </div>
+                                                        </div>
+                                                    </div>
+                                                    
+                                                    <!-- Progress Bar -->
+                                                    ${position.total_votes > 0 ? `
+                                                        <div class="mt-3">
+                                                            <div class="w-full bg-gray-200 rounded-full h-2">
+                                                                <div class="bg-green-600 h-2 rounded-full" style="width: ${candidate.percentage}%"></div>
+                                                            </div>
+                                                            <div class="text-sm text-gray-600 mt-1">
+                                                                VOTE SHARE: ${candidate.percentage}%
+                                                            </div>
+                                                        </div>
+                                                    ` : ''}
+                                                </div>
+                                            `).join('')}
+                                        </div>
+                                        
+                                        <!-- Total Votes -->
+                                        <div class="bg-gray-100 rounded-lg p-3 mt-4">
+                                            <p class="text-gray-700 font-semibold text-center">
+                                                📊 TOTAL VOTES CAST FOR THIS POSITION: ${position.total_votes}
+                                            </p>
+                                        </div>
+                                    ` : `
+                                        <div class="bg-yellow-50 border border-yellow-200 rounded-lg p-6 text-center">
+                                            <p class="text-yellow-700">📝 No candidates for this position</p>
+                                        </div>
+                                    `}
+                                </div>
+                            </div>
+                        `).join('')}
+                    </div>
+                `;
+                
+                updateStatus(`Results loaded for session: ${data.session.name}`);
+            } catch (error) {
+                updateStatus('Failed to load results: ' + error.message);
+            }
+        }
+
+        function exportResults() {
+            alert('Export functionality would be implemented here to download results as PDF or text file.');
+        }
+
+        // Initialize - only the default tab loads now, the others load when opened
+        document.addEventListener('DOMContentLoaded', function() {
+            loadSessions();
+            updateStatus('Application loaded successfully');
+        });
+
+        // Session form submission
+        document.getElementById('newSessionForm').addEventListener('submit', async (e) => {
+            e.preventDefault();
+            const formData = new FormData(e.target);
+            const data = Object.fromEntries(formData);
+            
+            try {
+                await apiCall('/api/sessions', {
+                    method: 'POST',
+                    body: JSON.stringify(data)
+                });
+                updateStatus('Session created successfully');
+                e.target.reset();
+                loadSessions();
+            } catch (error) {
+                updateStatus('Failed to create session: ' + error.message);
+            }
+        });
+
+        // Download voter data by class/grade
+        async function downloadVoterData() {
+            try {
+                const voters = await fetchAllVoters({ fields: 'name,student_id,grade,voter_code,has_voted' });
+                
+                // Group voters by grade
+                const votersByGrade = {};
+                voters.forEach(voter => {
+                    if (!votersByGrade[voter.grade]) {
+                        votersByGrade[voter.grade] = [];
+                    }
+                    votersByGrade[voter.grade].push(voter);
+                });
+                
+                // Sort grades (YEAR 7 to YEAR 12)
+                const sortedGrades = Object.keys(votersByGrade).sort((a, b) => {
+                    const getYearNumber = (grade) => parseInt(grade.replace('YEAR ', '')) || 0;
+                    return getYearNumber(a) - getYearNumber(b);
+                });
+                
+                // Create text content
+                let textContent = 'ARNDALE ACADEMY - VOTER REGISTRATION DATA\n';
+                textContent += '============================================\n';
+                textContent += `Generated: ${new Date().toLocaleString()}\n`;
+                textContent += `Total Voters: ${voters.length}\n\n`;
+                
+                // Add data for each grade
+                sortedGrades.forEach(grade => {
+                    const gradeVoters = votersByGrade[grade];
+                    const votedCount = gradeVoters.filter(v => v.has_voted).length;
+                    const notVotedCount = gradeVoters.length - votedCount;
+                    const participationRate = ((votedCount / gradeVoters.length) * 100).toFixed(1);
+                    
+                    textContent += `\n${'='.repeat(50)}\n`;
+                    textContent += `CLASS: ${grade}\n`;
+                    textContent += `${'='.repeat(50)}\n`;
+                    textContent += `Total Students: ${gradeVoters.length}\n`;
+                    textContent += `Voted: ${votedCount} | Not Voted: ${notVotedCount} | Participation: ${participationRate}%\n\n`;
+                    
+                    textContent += 'STUDENT ID      | NAME                     | VOTER CODE | STATUS\n';
+                    textContent += '-'.repeat(60) + '\n';
+                    
+                    gradeVoters.forEach(voter => {
+                        const studentId = voter.student_id.padEnd(15);
+                        const name = voter.name.padEnd(25).substring(0, 25);
+                        const voterCode = voter.voter_code.padEnd(10);
+                        const status = voter.has_voted ? 'VOTED' : 'NOT VOTED';
+                        
+                        textContent += `${studentId} | ${name} | ${voterCode} | ${status}\n`;
+                    });
+                });
+                
+                // Add summary
+                textContent += `\n${'='.repeat(60)}\n`;
+                textContent += 'SUMMARY BY CLASS\n';
+                textContent += `${'='.repeat(60)}\n`;
+                
+                sortedGrades.forEach(grade => {
+                    const gradeVoters = votersByGrade[grade];
+                    const votedCount = gradeVoters.filter(v => v.has_voted).length;
+                    const participationRate = ((votedCount / gradeVoters.length) * 100).toFixed(1);
+                    
+                    textContent += `${grade.padEnd(10)}: ${gradeVoters.length.toString().padEnd(3)} students | ${votedCount.toString().padEnd(3)} voted | ${participationRate}% participation\n`;
+                });
+                
+                // Create and download file
+                const blob = new Blob([textContent], { type: 'text/plain' });
+                const url = window.URL.createObjectURL(blob);
+                const a = document.createElement('a');
+                const timestamp = new Date().toISOString().split('T')[0];
+                
+                a.href = url;
+                a.download = `arndale_voters_${timestamp}.txt`;
+                document.body.appendChild(a);
+                a.click();
+                document.body.removeChild(a);
+                window.URL.revokeObjectURL(url);
+                
+                updateStatus('Voter data downloaded successfully');
+                
+            } catch (error) {
+                updateStatus('Failed to download voter data: ' + error.message);
+            }
+        }